@@ -1,30 +1,113 @@
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from . import crud
-from .config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from .cache import token_cache
+from .config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, AUTH_POOL_SIZE, AUTH_POOL_QUEUE, EVENT_TICKET_SECONDS
+)
 from .logger import setup_logger
+from .metrics import PASSWORD_HASH_DURATION, REGISTRY, CallbackGauge
 
 logger = setup_logger(__name__)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordPoolBusy(Exception):
+    pass
+
+
+class PasswordPool:
+    """Size-limited thread pool for bcrypt work that rejects instead of queueing without bound."""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-pool")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed_total = 0
+        self.rejected_total = 0
+        self.busy_seconds_total = 0.0
+
+    def submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected_total += 1
+            logger.warning("Password pool is saturated, rejecting request")
+            raise PasswordPoolBusy()
+        with self._lock:
+            self.queued += 1
+        try:
+            return self._executor.submit(self._run, fn, *args)
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            self._slots.release()
+            raise
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed_total += 1
+                self.busy_seconds_total += time.perf_counter() - started
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pool_size": self.max_workers,
+                "queue_limit": self.max_queue,
+                "running": self.running,
+                "queued": self.queued,
+                "completed_total": self.completed_total,
+                "rejected_total": self.rejected_total,
+                "busy_seconds_total": round(self.busy_seconds_total, 6),
+            }
+
+
+password_pool = PasswordPool(AUTH_POOL_SIZE, AUTH_POOL_QUEUE)
+
+for _stat in ("running", "queued", "rejected_total"):
+    REGISTRY.register(CallbackGauge(
+        f"password_pool_{_stat}", f"Password pool {_stat.replace('_', ' ')}.",
+        lambda stat=_stat: password_pool.stats()[stat]
+    ))
+
+
 def _handle_password_operation(operation: str, *args, log_msg: str):
-    logger.info(f"Attempting to {operation} password")
+    logger.info("Attempting to %s password", operation)
     try:
+        started = time.perf_counter()
         result = getattr(pwd_context, operation)(*args)
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, operation)
         logger.info(log_msg)
         return result
     except Exception as e:
-        logger.error(f"Error {operation} password: {e}")
+        logger.error("Error %s password: %s", operation, e)
         return False if operation == "verify" else None
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return _handle_password_operation(
         "verify",
         plain_password,
@@ -33,7 +116,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     result = _handle_password_operation(
         "hash",
         password,
@@ -44,17 +127,51 @@ def get_password_hash(password: str) -> str:
     return result
 
 
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_pool.submit(_verify, plain_password, hashed_password).result()
+
+
+def get_password_hash(password: str) -> str:
+    return password_pool.submit(_hash, password).result()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(password_pool.submit(_verify, plain_password, hashed_password))
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.wrap_future(password_pool.submit(_hash, password))
+
+
 def authenticate_user(db: Session, email: str, password: str):
-    logger.info(f"Attempting to authenticate user: {email}")
+    logger.info("Attempting to authenticate user: %s", email)
     try:
         user = crud.get_user_by_email(db, email)
         if not user or not user.is_active or not verify_password(password, user.password_hash):
-            logger.warning(f"Authentication failed for user {email}")
+            logger.warning("Authentication failed for user %s", email)
             return False
-        logger.info(f"User {email} authenticated successfully")
+        logger.info("User %s authenticated successfully", email)
         return user
+    except PasswordPoolBusy:
+        raise
     except Exception as e:
-        logger.error(f"Error during authentication: {e}")
+        logger.error("Error during authentication: %s", e)
+        return False
+
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    logger.info("Attempting to authenticate user: %s", email)
+    try:
+        user = await crud.get_user_by_email_async(db, email)
+        if not user or not user.is_active or not await verify_password_async(password, user.password_hash):
+            logger.warning("Authentication failed for user %s", email)
+            return False
+        logger.info("User %s authenticated successfully", email)
+        return user
+    except PasswordPoolBusy:
+        raise
+    except Exception as e:
+        logger.error("Error during authentication: %s", e)
         return False
 
 
@@ -63,14 +180,14 @@ def _create_token(data: dict, expires_delta: Optional[timedelta], token_type: st
         to_encode = data.copy()
         expire = datetime.now() + (expires_delta or timedelta(minutes=15))
         to_encode.update({"exp": expire})
-        if token_type == "refresh":
-            to_encode.update({"type": "refresh"})
+        if token_type != "access":
+            to_encode.update({"type": token_type})
 
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        logger.info(f"{token_type.title()} token created for user: {data.get('sub')}")
+        logger.info("%s token created for user: %s", token_type.title(), data.get('sub'))
         return encoded_jwt
     except Exception as e:
-        logger.error(f"Error creating {token_type} token: {e}")
+        logger.error("Error creating %s token: %s", token_type, e)
         raise
 
 
@@ -82,15 +199,29 @@ def create_refresh_token(data: dict):
     return _create_token(data, timedelta(days=30), "refresh")
 
 
+def create_event_ticket(email: str):
+    """Short-lived token that only opens an event stream (EventSource cannot send headers)."""
+    return _create_token({"sub": email}, timedelta(seconds=EVENT_TICKET_SECONDS), "event_stream")
+
+
 def decode_access_token(token: str):
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.debug(f"Token decoded successfully for user: {payload.get('sub')}")
-        return payload
+        logger.debug("Token decoded successfully for user: %s", payload.get('sub'))
     except (JWTError, Exception) as e:
-        logger.warning(f"Token decoding failed: {e}")
+        logger.warning("Token decoding failed: %s", e)
         return None
 
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        token_cache.set(cache_key, payload, ttl=ttl)
+    return payload
+
 
 def refresh_access_token(refresh_token: str):
     try:
@@ -104,7 +235,7 @@ def refresh_access_token(refresh_token: str):
             expires_delta=timedelta(minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES))
         )
     except JWTError as e:
-        logger.warning(f"Invalid refresh token: {e}")
+        logger.warning("Invalid refresh token: %s", e)
         return None
 
 
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import threading
+import time
+
+from .config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, TOKEN_CACHE_SIZE
+from .metrics import REGISTRY, CallbackGauge
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a per-entry time to live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+# Verified JWT claims keyed by token digest; every entry is stored with the token's remaining lifetime
+token_cache = TTLCache(TOKEN_CACHE_SIZE, 0)
+
+for _stat in ("size", "hits", "misses"):
+    REGISTRY.register(CallbackGauge(
+        f"cache_{_stat}", f"In-process cache {_stat}.",
+        lambda stat=_stat: {("principal",): principal_cache.stats()[stat], ("token",): token_cache.stats()[stat]},
+        ("cache",)
+    ))
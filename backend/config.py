@@ -2,10 +2,6 @@ import os
 
 from dotenv import load_dotenv
 
-from .logger import setup_logger
-
-logger = setup_logger(__name__)
-
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -14,3 +10,47 @@ ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 ADMIN_SECRET_WORD = os.getenv("ADMIN_SECRET_WORD")
+
+ATTACHMENT_STORAGE = os.getenv("ATTACHMENT_STORAGE", "local")
+ATTACHMENT_DIR = os.getenv("ATTACHMENT_DIR", "uploads")
+ATTACHMENT_CHUNK_SIZE = int(os.getenv("ATTACHMENT_CHUNK_SIZE", 64 * 1024))
+
+AUTH_POOL_SIZE = int(os.getenv("AUTH_POOL_SIZE", min(4, os.cpu_count() or 1)))
+AUTH_POOL_QUEUE = int(os.getenv("AUTH_POOL_QUEUE", 32))
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "rate_limits.db")
+RATE_LIMIT_MAX_ENTRIES = int(os.getenv("RATE_LIMIT_MAX_ENTRIES", 100_000))
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10_000))
+# Writes only invalidate the cache of the process that made them, so a deactivated user keeps access
+# to the other workers for up to this many seconds
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 10))
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", 100))
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", 25))
+EVENT_RETRY_MS = int(os.getenv("EVENT_RETRY_MS", 5000))
+# Lifetime of the ticket that opens an event stream; it travels in the URL, so it is kept short
+EVENT_TICKET_SECONDS = int(os.getenv("EVENT_TICKET_SECONDS", 30))
+
+# Clients that have not synced for longer than this must reload everything
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", 30))
+
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", 5))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+DB_CACHE_SIZE_KIB = int(os.getenv("DB_CACHE_SIZE_KIB", 64 * 1024))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", 256 * 1024 * 1024))
+
+LOG_FILE = os.getenv("LOG_FILE", "app.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 50 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 10))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Per-module overrides, e.g. "backend.crud=WARNING,backend.auth=DEBUG"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# Only every Nth occurrence of a sampled (high-volume success) message is written; 1 writes all
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", 10))
@@ -1,29 +1,54 @@
+from datetime import datetime, time
 from functools import wraps
+import inspect
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
+from sqlalchemy import and_, delete, desc, exists, func, insert, literal_column, or_, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from . import models, schemas
-from .auth import get_password_hash
-from .logger import setup_logger
-from backend.utils import get_file_size, get_content_type
+from . import auth, models, schemas
+from .cache import principal_cache
+from .logger import SAMPLED, setup_logger
+from .pagination import Cursor
+from .search import SNIPPET_END, SNIPPET_START, SNIPPET_TOKENS
+from .storage import BlobMissingError, StoredBlob, storage
+from backend.utils import get_content_type
 
 logger = setup_logger(__name__)
 
 
+def _log_result(operation_name, result):
+    if result is not None:
+        logger.info("Successfully %s", operation_name, extra=SAMPLED)
+    else:
+        logger.warning("Failed to %s - not found", operation_name)
+
+
 def handle_db_operation(operation_name):
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    result = await func(*args, **kwargs)
+                    _log_result(operation_name, result)
+                    return result
+                except Exception as e:
+                    logger.error("Error during %s: %s", operation_name, e)
+                    if 'db' in kwargs:
+                        await kwargs['db'].rollback()
+                    raise
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 result = func(*args, **kwargs)
-                if result is not None:
-                    logger.info(f"Successfully {operation_name}")
-                else:
-                    logger.warning(f"Failed to {operation_name} - not found")
+                _log_result(operation_name, result)
                 return result
             except Exception as e:
-                logger.error(f"Error during {operation_name}: {e}")
+                logger.error("Error during %s: %s", operation_name, e)
                 if 'db' in kwargs:
                     kwargs['db'].rollback()
                 raise
@@ -36,14 +61,125 @@ def get_user(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 
+def task_load_options(fields: tuple[str, ...] | None = None) -> tuple:
+    """Loader options reading only the columns of `fields` (all when None) and task_files only for "files"."""
+    if fields is None:
+        return (selectinload(models.Task.files),)
+    # created_at is kept for the page cursor; the primary key is always loaded
+    columns = [getattr(models.Task, name) for name in dict.fromkeys((*fields, "created_at")) if name != "files"]
+    options = (load_only(*columns),)
+    if "files" in fields:
+        options += (selectinload(models.Task.files),)
+    return options
+
+
+def _user_with_tasks_query(user_id: int, fields: tuple[str, ...] | None = None):
+    return select(models.User).options(
+        selectinload(models.User.tasks).options(*task_load_options(fields)),
+        selectinload(models.User.created_tasks).options(*task_load_options(fields))
+    ).where(models.User.id == user_id)
+
+
+@handle_db_operation("retrieve user with tasks")
+def get_user_with_tasks(db: Session, user_id: int, fields: tuple[str, ...] | None = None):
+    return db.scalars(_user_with_tasks_query(user_id, fields)).first()
+
+
+@handle_db_operation("retrieve user with tasks")
+async def get_user_with_tasks_async(db: AsyncSession, user_id: int, fields: tuple[str, ...] | None = None):
+    return (await db.scalars(_user_with_tasks_query(user_id, fields))).first()
+
+
+def _user_summary_query(user_id: int):
+    tasks_count = select(func.count(models.Task.id)).where(
+        models.Task.user_id == models.User.id
+    ).scalar_subquery()
+    created_tasks_count = select(func.count(models.Task.id)).where(
+        models.Task.created_by_id == models.User.id
+    ).scalar_subquery()
+    return select(
+        models.User.id,
+        models.User.email,
+        models.User.created_at,
+        models.User.role,
+        models.User.is_active,
+        tasks_count.label("tasks_count"),
+        created_tasks_count.label("created_tasks_count")
+    ).where(models.User.id == user_id)
+
+
+@handle_db_operation("retrieve user summary")
+def get_user_summary(db: Session, user_id: int):
+    return db.execute(_user_summary_query(user_id)).first()
+
+
+@handle_db_operation("retrieve user summary")
+async def get_user_summary_async(db: AsyncSession, user_id: int):
+    return (await db.execute(_user_summary_query(user_id))).first()
+
+
+async def get_collection_version_async(db: AsyncSession, user_id: int) -> int | None:
+    return await db.scalar(select(models.User.collection_version).where(models.User.id == user_id))
+
+
+def overdue_cutoff() -> datetime:
+    """Start of today: open tasks due before it are overdue, in the task list filter and in the stats alike."""
+    return datetime.combine(models.now_moscow().date(), time.min)
+
+
+def _task_stats_query(scope: str, owner_id: int):
+    return select(
+        models.TaskStat.status, models.TaskStat.priority, models.TaskStat.due_day, models.TaskStat.count
+    ).where(models.TaskStat.scope == scope, models.TaskStat.owner_id == owner_id)
+
+
+def _count_tasks(rows, today: str) -> schemas.TaskCounts:
+    counts = schemas.TaskCounts()
+    for task_status, priority, due_day, count in rows:
+        counts.total += count
+        counts.by_status[task_status] = counts.by_status.get(task_status, 0) + count
+        counts.by_priority[priority] = counts.by_priority.get(priority, 0) + count
+        if due_day and due_day < today:
+            counts.overdue += count
+        elif due_day == today:
+            counts.due_today += count
+    return counts
+
+
+@handle_db_operation("retrieve task stats")
+async def get_task_stats_async(db: AsyncSession, scope: str, owner_id: int) -> schemas.TaskCounts:
+    """Counts of the tasks assigned to ("assignee") or created by ("creator") a user, read from task_stats."""
+    rows = (await db.execute(_task_stats_query(scope, owner_id))).all()
+    return _count_tasks(rows, overdue_cutoff().date().isoformat())
+
+
+def _user_by_email_query(email: str):
+    return select(models.User).where(models.User.email == email)
+
+
 @handle_db_operation("retrieve user by email")
 def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+    return db.scalars(_user_by_email_query(email)).first()
+
+
+@handle_db_operation("retrieve user by email")
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    return (await db.scalars(_user_by_email_query(email))).first()
+
+
+@handle_db_operation("retrieve password hash")
+async def get_user_password_hash_async(db: AsyncSession, user_id: int) -> str | None:
+    return await db.scalar(select(models.User.password_hash).where(models.User.id == user_id))
 
 
 @handle_db_operation("retrieve users")
-def get_users(db: Session, skip: int = 0, limit: int = 10):
-    users = db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 10, cursor: Cursor | None = None):
+    query = db.query(models.User)
+    if cursor is not None:
+        query = query.filter(tuple_(models.User.created_at, models.User.id) > tuple(cursor))
+    elif skip:
+        query = query.offset(skip)
+    users = query.order_by(models.User.created_at, models.User.id).limit(limit).all()
     return users
 
 
@@ -51,8 +187,8 @@ def get_users(db: Session, skip: int = 0, limit: int = 10):
 def create_user(db: Session, user: schemas.UserCreate) -> models.User:
     db_user = models.User(
         email=user.email,
-        password_hash=get_password_hash(user.password),
-        secret_word=get_password_hash(user.secret_word),
+        password_hash=auth.get_password_hash(user.password),
+        secret_word=auth.get_password_hash(user.secret_word),
         group_id=user.group_id
     )
     db.add(db_user)
@@ -65,8 +201,11 @@ def create_user(db: Session, user: schemas.UserCreate) -> models.User:
 def delete_user(db: Session, user_id: int):
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if db_user:
+        blob_keys = _task_blob_keys(db, models.Task.user_id == user_id)
         db.delete(db_user)
         db.commit()
+        principal_cache.invalidate(db_user.email)
+        _release_blobs(db, blob_keys)
     return db_user
 
 
@@ -74,37 +213,202 @@ def delete_user(db: Session, user_id: int):
 def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if db_user:
+        old_email = db_user.email
         update_data = user_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             if key == "password":
-                db_user.password_hash = get_password_hash(value)
+                db_user.password_hash = auth.get_password_hash(value)
             else:
                 setattr(db_user, key, value)
         db.commit()
         db.refresh(db_user)
+        principal_cache.invalidate(old_email)
+        principal_cache.invalidate(db_user.email)
+    return db_user
+
+
+@handle_db_operation("update user password")
+def update_user_password_hash(db: Session, user_id: int, password_hash: str):
+    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    if db_user:
+        db_user.password_hash = password_hash
+        db.commit()
+        db.refresh(db_user)
+        principal_cache.invalidate(db_user.email)
+    return db_user
+
+
+@handle_db_operation("update user password")
+async def update_user_password_hash_async(db: AsyncSession, user_id: int, password_hash: str):
+    db_user = await db.get(models.User, user_id)
+    if db_user:
+        db_user.password_hash = password_hash
+        await db.commit()
+        principal_cache.invalidate(db_user.email)
+    return db_user
+
+
+@handle_db_operation("update user status")
+def set_user_active(db: Session, user_id: int, is_active: bool):
+    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    if db_user:
+        db_user.is_active = is_active
+        db.commit()
+        db.refresh(db_user)
+        principal_cache.invalidate(db_user.email)
     return db_user
 
 
+def visible_task_filter(user_id: int, entity=models.Task):
+    """Tasks a user may act on: assigned to them, or created by them when they are a PM."""
+    is_pm = exists().where(models.User.id == user_id, models.User.role == 'pm')
+    return or_(
+        entity.user_id == user_id,
+        and_(entity.created_by_id == user_id, is_pm)
+    )
+
+
+def _task_query(task_id: int, user_id: int):
+    return select(models.Task).options(selectinload(models.Task.files)).where(
+        models.Task.id == task_id,
+        visible_task_filter(user_id)
+    )
+
+
 @handle_db_operation("retrieve task")
 def get_task(db: Session, task_id: int, user_id: int):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    return db.scalars(_task_query(task_id, user_id)).first()
 
-    if not (task and user):
+
+@handle_db_operation("retrieve task")
+async def get_task_async(db: AsyncSession, task_id: int, user_id: int):
+    return (await db.scalars(_task_query(task_id, user_id))).first()
+
+
+def _task_changes_queries(user_id: int, since: int, until: int, limit: int):
+    window = (models.Task.change_seq > since, models.Task.change_seq <= until)
+    tasks = select(models.Task).options(selectinload(models.Task.files)).where(
+        *window, visible_task_filter(user_id)
+    ).order_by(models.Task.change_seq).limit(limit)
+
+    # A task that left the user's view and came back is sent as a change, not as a deletion
+    still_visible = exists().where(models.Task.id == models.Tombstone.task_id, visible_task_filter(user_id))
+    tombstones = select(models.Tombstone).where(
+        models.Tombstone.change_seq > since,
+        models.Tombstone.change_seq <= until,
+        visible_task_filter(user_id, models.Tombstone),
+        or_(models.Tombstone.kind == "file", ~still_visible)
+    ).order_by(models.Tombstone.change_seq).limit(limit)
+    return tasks, tombstones
+
+
+@handle_db_operation("retrieve task changes")
+async def get_task_changes_async(db: AsyncSession, user_id: int, since: int, limit: int = 500) -> dict | None:
+    """Tasks changed and tasks or files deleted after `since`; None when its tombstones were already pruned."""
+    sequence = (await db.execute(select(models.ChangeSequence.value, models.ChangeSequence.pruned_through))).first()
+    until, pruned_through = sequence or (0, 0)
+    if 0 < since < pruned_through:
         return None
 
-    return task if (task.user_id == user_id or
-                   (user.role == 'pm' and task.created_by_id == user_id)) else None
+    # Everything numbered up to `until` was committed before it was read, so stopping there and
+    # resuming from it later cannot skip a write, however the two queries below interleave with writers
+    tasks_query, tombstones_query = _task_changes_queries(user_id, since, until, limit + 1)
+    changes = sorted(
+        [*(await db.scalars(tasks_query)).all(), *(await db.scalars(tombstones_query)).all()],
+        key=lambda change: change.change_seq
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    result = {
+        "tasks": [], "deleted_tasks": [], "deleted_files": [],
+        "cursor": changes[-1].change_seq if has_more else until, "has_more": has_more
+    }
+    for change in changes:
+        if isinstance(change, models.Task):
+            result["tasks"].append(change)
+        elif change.kind == "file":
+            result["deleted_files"].append(change.object_id)
+        else:
+            result["deleted_tasks"].append(change.object_id)
+    return result
+
+
+# ORDER BY of each TaskSort; ties are broken by recency so that pages are stable
+TASK_SORT_ORDER = {
+    schemas.TaskSort.CREATED_DESC: (desc(models.Task.created_at), desc(models.Task.id)),
+    schemas.TaskSort.CREATED_ASC: (models.Task.created_at, models.Task.id),
+    schemas.TaskSort.DUE_DATE_ASC: (models.Task.due_date.asc().nulls_last(), desc(models.Task.id)),
+    schemas.TaskSort.DUE_DATE_DESC: (models.Task.due_date.desc().nulls_last(), desc(models.Task.id)),
+    schemas.TaskSort.PRIORITY_ASC: (models.Task.priority, desc(models.Task.created_at), desc(models.Task.id)),
+    schemas.TaskSort.PRIORITY_DESC: (desc(models.Task.priority), desc(models.Task.created_at), desc(models.Task.id)),
+}
+
+OPEN_TASK_STATUSES = (schemas.TaskStatus.PROPOSED, schemas.TaskStatus.IN_PROGRESS)
+
+
+def _apply_task_filters(query, filters: schemas.TaskFilters):
+    if filters.status:
+        query = query.where(models.Task.status.in_(filters.status))
+    if filters.overdue:
+        # Spelled as IN rather than != COMPLETE so that the (…, status, due_date) indexes stay usable
+        query = query.where(models.Task.status.in_(OPEN_TASK_STATUSES), models.Task.due_date < overdue_cutoff())
+    if filters.due_after is not None:
+        query = query.where(models.Task.due_date >= filters.due_after)
+    if filters.due_before is not None:
+        query = query.where(models.Task.due_date < filters.due_before)
+    if filters.priority_min is not None:
+        query = query.where(models.Task.priority >= filters.priority_min)
+    if filters.priority_max is not None:
+        query = query.where(models.Task.priority <= filters.priority_max)
+    return query
+
+
+def _filtered_tasks_query(filter_field: str, filter_value: int, skip: int = 0, limit: int = 10,
+                          filters: schemas.TaskFilters | None = None, cursor: Cursor | None = None,
+                          fields: tuple[str, ...] | None = None):
+    """Tasks whose `filter_field` equals `filter_value`; `cursor` applies to the default newest-first sort only."""
+    filters = filters or schemas.TaskFilters()
+    query = select(models.Task).options(*task_load_options(fields)).where(
+        getattr(models.Task, filter_field) == filter_value
+    )
+    query = _apply_task_filters(query, filters)
+
+    if cursor is not None:
+        query = query.where(tuple_(models.Task.created_at, models.Task.id) < tuple(cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    return query.order_by(*TASK_SORT_ORDER[filters.sort]).limit(limit)
 
 
-def get_filtered_tasks(db: Session, filter_field: str, filter_value: int, skip: int = 0, limit: int = 10,
-                       completed: bool | None = None):
-    query = db.query(models.Task).filter(getattr(models.Task, filter_field) == filter_value)
+def get_filtered_tasks(db: Session, filter_field: str, filter_value: int, **kwargs):
+    return db.scalars(_filtered_tasks_query(filter_field, filter_value, **kwargs)).all()
 
-    if completed is not None:
-        query = query.filter(models.Task.completed == completed)
 
-    return query.order_by(desc(models.Task.created_at)).offset(skip).limit(limit).all()
+async def get_filtered_tasks_async(db: AsyncSession, filter_field: str, filter_value: int, **kwargs):
+    return (await db.scalars(_filtered_tasks_query(filter_field, filter_value, **kwargs))).all()
+
+
+def _search_tasks_query(match: str, user_id: int, limit: int, offset: int):
+    fts = literal_column("tasks_fts")
+    # Matches in the title weigh ten times more than matches in the description
+    rank = func.bm25(fts, 10.0, 1.0).label("rank")
+    snippet = func.snippet(fts, -1, SNIPPET_START, SNIPPET_END, "…", SNIPPET_TOKENS).label("snippet")
+    return select(models.Task, snippet, rank).join(
+        models.task_search, models.task_search.c.rowid == models.Task.id
+    ).where(
+        fts.op("MATCH")(match),
+        visible_task_filter(user_id)
+    ).options(selectinload(models.Task.files)).order_by(rank, models.Task.id).limit(limit).offset(offset)
+
+
+def search_tasks(db: Session, match: str, user_id: int, limit: int = 20, offset: int = 0):
+    return db.execute(_search_tasks_query(match, user_id, limit, offset)).all()
+
+
+async def search_tasks_async(db: AsyncSession, match: str, user_id: int, limit: int = 20, offset: int = 0):
+    return (await db.execute(_search_tasks_query(match, user_id, limit, offset))).all()
 
 
 def get_assigned_tasks(db: Session, created_by_id: int, **kwargs):
@@ -115,22 +419,51 @@ def get_user_tasks(db: Session, user_id: int, **kwargs):
     return get_filtered_tasks(db, 'user_id', user_id, **kwargs)
 
 
+async def get_assigned_tasks_async(db: AsyncSession, created_by_id: int, **kwargs):
+    return await get_filtered_tasks_async(db, 'created_by_id', created_by_id, **kwargs)
+
+
+async def get_user_tasks_async(db: AsyncSession, user_id: int, **kwargs):
+    return await get_filtered_tasks_async(db, 'user_id', user_id, **kwargs)
+
+
 @handle_db_operation("create task")
 def create_task(db: Session, task: schemas.TaskCreate, user_id: int, created_by_id: int):
-    db_task = models.Task(
-        title=task.title,
-        description=task.description,
-        priority=task.priority,
-        due_date=task.due_date,
-        user_id=user_id,
-        created_by_id=created_by_id
-    )
+    db_task = models.Task(**task_values(task, user_id, created_by_id))
     db.add(db_task)
     db.commit()
     db.refresh(db_task)
     return db_task
 
 
+def task_values(task: schemas.TaskCreate, user_id: int, created_by_id: int) -> dict:
+    return {
+        "title": task.title,
+        "description": task.description,
+        "priority": task.priority,
+        "due_date": task.due_date,
+        "user_id": user_id,
+        "created_by_id": created_by_id,
+    }
+
+
+@handle_db_operation("bulk create tasks")
+def create_tasks_bulk(db: Session, rows: list[dict]) -> list[int]:
+    """Insert all rows in one transaction with batched INSERT ... RETURNING and return their ids in row order."""
+    if not rows:
+        return []
+    stmt = insert(models.Task).returning(models.Task.id, sort_by_parameter_order=True)
+    ids = list(db.scalars(stmt, rows))
+    db.commit()
+    return ids
+
+
+def get_existing_user_ids(db: Session, user_ids) -> set[int]:
+    if not user_ids:
+        return set()
+    return set(db.scalars(select(models.User.id).where(models.User.id.in_(user_ids))))
+
+
 @handle_db_operation("update task")
 def update_task(db: Session, task_id: int, user_id: int, task_update: dict):
     db_task = get_task(db, task_id, user_id)
@@ -142,6 +475,51 @@ def update_task(db: Session, task_id: int, user_id: int, task_update: dict):
     return db_task
 
 
+# Columns a TaskUpdate may change in bulk
+BULK_UPDATE_TASK_FIELDS = ("title", "description", "status", "due_date", "priority")
+
+
+@handle_db_operation("bulk update tasks")
+def update_tasks_bulk(db: Session, task_ids: list[int], user_id: int, changes: dict):
+    """Apply `changes` to every visible task in `task_ids` with one UPDATE.
+
+    Returns (id, user_id, created_by_id) of the updated tasks, ordered by id.
+    """
+    stmt = update(models.Task).where(
+        models.Task.id.in_(task_ids),
+        visible_task_filter(user_id)
+    ).values(**changes).returning(
+        models.Task.id, models.Task.user_id, models.Task.created_by_id
+    ).execution_options(synchronize_session=False)
+    updated = sorted(db.execute(stmt).all())
+    db.commit()
+    return updated
+
+
+@handle_db_operation("bulk reassign tasks")
+def reassign_tasks_bulk(db: Session, created_by_id: int, from_user_id: int, to_user_id: int,
+                        status: int | None = None, due_before=None, due_after=None) -> list[int]:
+    """Move every task `created_by_id` assigned to `from_user_id` over to `to_user_id` with one UPDATE."""
+    conditions = [models.Task.created_by_id == created_by_id, models.Task.user_id == from_user_id]
+    if status is not None:
+        conditions.append(models.Task.status == status)
+    if due_before is not None:
+        conditions.append(models.Task.due_date < due_before)
+    if due_after is not None:
+        conditions.append(models.Task.due_date >= due_after)
+
+    stmt = update(models.Task).where(*conditions).values(user_id=to_user_id).returning(
+        models.Task.id
+    ).execution_options(synchronize_session=False)
+    reassigned = sorted(db.scalars(stmt).all())
+    db.commit()
+    return reassigned
+
+
+def get_task_assignee_id(db: Session, task_id: int) -> int | None:
+    return db.scalar(select(models.Task.user_id).where(models.Task.id == task_id))
+
+
 @handle_db_operation("reassign task")
 def reassign_task(db: Session, task_id: int, new_user_id: int, created_by_id: int):
     db_task = db.query(models.Task).filter(
@@ -173,8 +551,10 @@ def delete_task_base(db: Session, task_id: int, user_id: int, id_field: str):
     ).first()
 
     if db_task:
+        blob_keys = _task_blob_keys(db, models.Task.id == task_id)
         db.delete(db_task)
         db.commit()
+        _release_blobs(db, blob_keys)
     return db_task
 
 
@@ -185,36 +565,147 @@ def update_user_role(db: Session, user_id: int, new_role: str):
         db_user.role = new_role
         db.commit()
         db.refresh(db_user)
+        principal_cache.invalidate(db_user.email)
     return db_user
 
 
-@handle_db_operation("create task file")
-def create_task_file(db: Session, task_id: int, filename: str, file_data: bytes) -> models.TaskFile:
-    content_type = get_content_type(filename)
-    file_size = get_file_size(file_data)
-
-    db_file = models.TaskFile(
+def _new_task_file(task_id: int, filename: str, blob: StoredBlob) -> models.TaskFile:
+    return models.TaskFile(
         filename=filename,
-        content_type=content_type,
-        data=file_data,
-        size=file_size,
+        content_type=get_content_type(filename),
+        blob_key=blob.key,
+        size=blob.size,
         task_id=task_id
     )
 
+
+@handle_db_operation("create task file")
+def create_task_file(db: Session, task_id: int, filename: str, blob: StoredBlob) -> models.TaskFile:
+    db_file = _new_task_file(task_id, filename, blob)
     db.add(db_file)
+    db.flush()
+    # The insert holds the write lock that release_blobs needs, so the blob cannot go away before the commit
+    if not storage.exists(blob.key):
+        db.rollback()
+        raise BlobMissingError(blob.key)
     db.commit()
     db.refresh(db_file)
     return db_file
 
 
+@handle_db_operation("create task file")
+async def create_task_file_async(db: AsyncSession, task_id: int, filename: str, blob: StoredBlob) -> models.TaskFile:
+    db_file = _new_task_file(task_id, filename, blob)
+    db.add(db_file)
+    await db.flush()
+    # The insert holds the write lock that release_blobs needs, so the blob cannot go away before the commit
+    if not storage.exists(blob.key):
+        await db.rollback()
+        raise BlobMissingError(blob.key)
+    await db.commit()
+    await db.refresh(db_file)
+    return db_file
+
+
 @handle_db_operation("get task file")
 def get_task_file(db: Session, file_id: int) -> models.TaskFile:
-    return db.query(models.TaskFile).filter(models.TaskFile.id == file_id).first()
+    return db.get(models.TaskFile, file_id)
+
+
+@handle_db_operation("get task file")
+async def get_task_file_async(db: AsyncSession, file_id: int) -> models.TaskFile:
+    return await db.get(models.TaskFile, file_id)
+
+
+def _task_file_chunk_query(file_id: int, offset: int, size: int):
+    return select(func.substr(models.TaskFile.data, offset + 1, size)).where(models.TaskFile.id == file_id)
+
+
+def iter_task_file_data(db: Session, file_id: int, offset: int, length: int, chunk_size: int = 64 * 1024):
+    end = offset + length
+    while offset < end:
+        chunk = db.scalar(_task_file_chunk_query(file_id, offset, min(chunk_size, end - offset)))
+        if not chunk:
+            break
+        offset += len(chunk)
+        yield chunk
+
+
+async def iter_task_file_data_async(db: AsyncSession, file_id: int, offset: int, length: int,
+                                    chunk_size: int = 64 * 1024):
+    end = offset + length
+    while offset < end:
+        chunk = await db.scalar(_task_file_chunk_query(file_id, offset, min(chunk_size, end - offset)))
+        if not chunk:
+            break
+        offset += len(chunk)
+        yield chunk
+
+
+TASK_FILE_METADATA_COLUMNS = (
+    models.TaskFile.id,
+    models.TaskFile.filename,
+    models.TaskFile.content_type,
+    models.TaskFile.size,
+    models.TaskFile.created_at,
+    models.TaskFile.task_id,
+)
+
+
+def _task_files_query(task_id: int):
+    return select(*TASK_FILE_METADATA_COLUMNS).where(
+        models.TaskFile.task_id == task_id
+    ).order_by(models.TaskFile.id)
+
+
+@handle_db_operation("get task files")
+def get_task_files(db: Session, task_id: int):
+    return db.execute(_task_files_query(task_id)).all()
 
 
 @handle_db_operation("get task files")
-def get_task_files(db: Session, task_id: int) -> list[models.TaskFile]:
-    return db.query(models.TaskFile).filter(models.TaskFile.task_id == task_id).all()
+async def get_task_files_async(db: AsyncSession, task_id: int):
+    return (await db.execute(_task_files_query(task_id))).all()
+
+
+def _task_blob_keys(db: Session, task_filter) -> set[str]:
+    rows = db.query(models.TaskFile.blob_key).join(models.Task).filter(
+        task_filter,
+        models.TaskFile.blob_key.is_not(None)
+    ).distinct().all()
+    return {row.blob_key for row in rows}
+
+
+def _collect_blob_statements(blob_key: str):
+    # A key without a row (an upload that was never recorded) counts as unreferenced
+    placeholder = sqlite_insert(models.BlobRef).values(blob_key=blob_key, count=0).on_conflict_do_nothing()
+    unused = delete(models.BlobRef).where(models.BlobRef.blob_key == blob_key, models.BlobRef.count <= 0)
+    return placeholder, unused
+
+
+def _release_blobs(db: Session, blob_keys) -> None:
+    """Delete the blobs of `blob_keys` that no task file references any more.
+
+    The blob is removed inside the transaction that deletes its blob_refs row; that transaction holds
+    SQLite's write lock, so an upload reusing the key either commits its reference first or finds the
+    blob gone (BlobMissingError) and stores it again.
+    """
+    for blob_key in blob_keys:
+        placeholder, unused = _collect_blob_statements(blob_key)
+        db.execute(placeholder)
+        if db.execute(unused).rowcount:
+            storage.delete(blob_key)
+        db.commit()
+
+
+async def release_blobs_async(db: AsyncSession, blob_keys) -> None:
+    """Async counterpart of _release_blobs."""
+    for blob_key in blob_keys:
+        placeholder, unused = _collect_blob_statements(blob_key)
+        await db.execute(placeholder)
+        if (await db.execute(unused)).rowcount:
+            storage.delete(blob_key)
+        await db.commit()
 
 
 @handle_db_operation("delete task file")
@@ -223,4 +714,26 @@ def delete_task_file(db: Session, file_id: int) -> models.TaskFile:
     if db_file:
         db.delete(db_file)
         db.commit()
+        _release_blobs(db, [db_file.blob_key] if db_file.blob_key else [])
     return db_file
+
+
+def get_inline_task_file_ids(db: Session, limit: int = 50) -> list[int]:
+    rows = db.query(models.TaskFile.id).filter(
+        models.TaskFile.blob_key.is_(None)
+    ).order_by(models.TaskFile.id).limit(limit).all()
+    return [row.id for row in rows]
+
+
+@handle_db_operation("move task file to storage")
+def move_task_file_to_storage(db: Session, file_id: int) -> str:
+    data = db.query(models.TaskFile.data).filter(models.TaskFile.id == file_id).scalar()
+    blob = storage.save_bytes(data or b"")
+    db.query(models.TaskFile).filter(models.TaskFile.id == file_id).update(
+        {models.TaskFile.blob_key: blob.key, models.TaskFile.data: b"", models.TaskFile.size: blob.size},
+        synchronize_session=False
+    )
+    if not storage.exists(blob.key):
+        # Collected after save_bytes reused it; the update now holds the write lock, so store it again
+        storage.save_bytes(data or b"")
+    return blob.key
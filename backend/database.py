@@ -1,36 +1,104 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy import event
 
-import logging
+from .config import (
+    DB_PROFILE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_READ_POOL_SIZE,
+    DB_BUSY_TIMEOUT_MS, DB_CACHE_SIZE_KIB, DB_MMAP_SIZE
+)
+from .logger import setup_logger
+from .metrics import instrument_engine
 
-logger = logging.getLogger(__name__)
+logger = setup_logger(__name__)
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./task_manager.db"
+DATABASE_PATH = "./task_manager.db"
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+# Read-only URI connections: SQLite itself refuses writes on them
+ASYNC_READONLY_DATABASE_URL = f"sqlite+aiosqlite:///file:{DATABASE_PATH}?mode=ro&uri=true"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# Pragmas applied to every new connection, per DB_PROFILE. "legacy" keeps SQLite defaults
+# (rollback journal, synchronous=FULL) and only exists for comparison.
+SQLITE_PROFILES = {
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": DB_BUSY_TIMEOUT_MS,
+        "cache_size": -DB_CACHE_SIZE_KIB,
+        "mmap_size": DB_MMAP_SIZE,
+        "temp_store": "MEMORY",
+    },
+    "legacy": {},
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+def sqlite_pragmas(profile: str) -> dict:
+    try:
+        return SQLITE_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown database profile: {profile}")
 
 
-def set_sqlite_timezone(dbapi_connection, connection_record):
-    try:
+def apply_sqlite_profile(engine: Engine, profile: str = DB_PROFILE) -> None:
+    pragmas = sqlite_pragmas(profile)
+
+    def set_pragmas(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
         try:
-            cursor.execute('PRAGMA timezone = "+03:00"')
-            logger.info("Database engine created successfully with timezone UTC+3")
+            # One failing pragma (e.g. journal_mode on a read-only connection) must not skip the others
+            for name, value in pragmas.items():
+                try:
+                    cursor.execute(f"PRAGMA {name} = {value}")
+                except Exception as e:
+                    logger.error("Error applying PRAGMA %s = %s of %s database profile: %s", name, value, profile, e)
         finally:
             cursor.close()
-    except Exception as e:
-        logger.error(f"Error setting timezone: {str(e)}")
 
+    event.listen(engine, 'connect', set_pragmas)
+
+
+def build_engine(url: str, profile: str = DB_PROFILE, pool_size: int = DB_POOL_SIZE) -> Engine:
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=DB_MAX_OVERFLOW
+    )
+    apply_sqlite_profile(engine, profile)
+    return engine
+
+
+def build_async_engine(url: str, profile: str = DB_PROFILE, pool_size: int = DB_POOL_SIZE) -> AsyncEngine:
+    engine = create_async_engine(url, pool_size=pool_size, max_overflow=DB_MAX_OVERFLOW)
+    apply_sqlite_profile(engine.sync_engine, profile)
+    return engine
 
-event.listen(engine, 'connect', set_sqlite_timezone)
+
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Used by the async request handlers; expire_on_commit=False keeps committed rows usable without lazy IO
+async_engine = build_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Separate pool for GET traffic so reads never queue behind connections busy writing; DB_READ_POOL_SIZE=0 disables it
+async_read_engine = (
+    build_async_engine(ASYNC_READONLY_DATABASE_URL, pool_size=DB_READ_POOL_SIZE)
+    if DB_READ_POOL_SIZE > 0 else async_engine
+)
+
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+if async_read_engine is not async_engine:
+    instrument_engine(async_read_engine.sync_engine, "read")
+
+Base = declarative_base()
 
 
 def get_db():
@@ -0,0 +1,141 @@
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, Callable, Iterator, Mapping, Optional, Tuple, Union
+from urllib.parse import quote
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from . import models
+from .config import ATTACHMENT_CHUNK_SIZE
+from .metrics import ATTACHMENT_BYTES_SERVED
+from .storage import AttachmentStorage
+
+
+def file_etag(file: models.TaskFile) -> str:
+    if file.blob_key is not None:
+        return f'"{file.blob_key}"'
+    return f'"inline-{file.id}-{file.size}-{int(file.created_at.timestamp())}"'
+
+
+def file_last_modified(file: models.TaskFile) -> str:
+    return formatdate(file.created_at.timestamp(), usegmt=True)
+
+
+def is_not_modified(request_headers: Mapping[str, str], etag: str, last_modified: str) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_single_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single `bytes=` range into an inclusive (start, end) pair; None means serve the whole body."""
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    start_str, _, end_str = ranges.strip().partition("-")
+    try:
+        if start_str == "":
+            length = int(end_str)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(size - length, 0), size - 1
+        start = int(start_str)
+        end = min(int(end_str), size - 1) if end_str else size - 1
+    except ValueError:
+        raise ValueError(f"Malformed range header: {range_header}")
+
+    if start >= size or start > end:
+        raise ValueError(f"Range not satisfiable: {range_header}")
+    return start, end
+
+
+def _if_range_matches(request_headers: Mapping[str, str], etag: str, last_modified: str) -> bool:
+    if_range = request_headers.get("if-range")
+    return if_range is None or if_range in (etag, last_modified)
+
+
+def build_file_response(
+    file: models.TaskFile,
+    request_headers: Mapping[str, str],
+    storage: AttachmentStorage,
+    read_inline: Callable[[int, int], Union[Iterator[bytes], AsyncIterator[bytes]]],
+) -> Response:
+    """Serve an attachment with validators, 304s and single-range 206s without buffering it whole.
+
+    Blobs kept on disk go through FileResponse, which handles ranges itself and uses
+    the ASGI pathsend extension (sendfile) when the server offers it. Legacy inline
+    blobs are streamed from the database with `read_inline(offset, length)`.
+    """
+    etag = file_etag(file)
+    last_modified = file_last_modified(file)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(file.filename)}",
+    }
+
+    if is_not_modified(request_headers, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    local_path = storage.local_path(file.blob_key) if file.blob_key is not None else None
+    if local_path is not None:
+        ATTACHMENT_BYTES_SERVED.inc("file", amount=_served_length(request_headers, file.size, etag, last_modified))
+        return FileResponse(local_path, media_type=file.content_type, headers=headers)
+
+    headers["Accept-Ranges"] = "bytes"
+    start, end = 0, file.size - 1
+    status_code = 200
+    range_header = request_headers.get("range")
+    if range_header and file.size > 0 and _if_range_matches(request_headers, etag, last_modified):
+        try:
+            byte_range = parse_single_range(range_header, file.size)
+        except ValueError:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{file.size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{file.size}"
+
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+    if file.blob_key is not None:
+        body = _iter_stream(storage, file.blob_key, start, end)
+        ATTACHMENT_BYTES_SERVED.inc("stream", amount=max(end - start + 1, 0))
+    else:
+        body = read_inline(start, end - start + 1)
+        ATTACHMENT_BYTES_SERVED.inc("inline", amount=max(end - start + 1, 0))
+    return StreamingResponse(body, status_code=status_code, media_type=file.content_type, headers=headers)
+
+
+def _served_length(request_headers: Mapping[str, str], size: int, etag: str, last_modified: str) -> int:
+    """Body length FileResponse will send for these headers, counted up front instead of per chunk."""
+    range_header = request_headers.get("range")
+    if not range_header or size == 0 or not _if_range_matches(request_headers, etag, last_modified):
+        return size
+    try:
+        byte_range = parse_single_range(range_header, size)
+    except ValueError:
+        return 0
+    return size if byte_range is None else byte_range[1] - byte_range[0] + 1
+
+
+def _iter_stream(storage: AttachmentStorage, key: str, start: int, end: int) -> Iterator[bytes]:
+    with storage.open(key) as stream:
+        stream.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = stream.read(min(ATTACHMENT_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, Optional, Set
+
+from .config import EVENT_HEARTBEAT_SECONDS, EVENT_QUEUE_SIZE, EVENT_RETRY_MS
+from .logger import setup_logger
+from .metrics import REGISTRY, CallbackGauge, Counter
+
+logger = setup_logger(__name__)
+
+EVENTS_DROPPED = REGISTRY.register(Counter(
+    "event_subscribers_dropped_total", "Event streams closed because the client did not keep up."
+))
+
+
+class Subscription:
+    """One open event stream: a bounded queue of preformatted SSE messages owned by an event loop."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def _put(self, message: str) -> None:
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A slow consumer is cut off rather than buffered; it reloads everything when it reconnects
+            self.close()
+            EVENTS_DROPPED.inc()
+            logger.warning("Dropping event stream of user %s: queue full", self.user_id)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventHub:
+    """In-process fan-out of task events to the open event streams of the users they concern."""
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, event: str, user_ids: Iterable[int], data: dict) -> None:
+        """Send `data` as an `event` to every stream of `user_ids`; safe to call from any thread."""
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in set(user_ids)
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        if not targets:
+            return
+        message = f"event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+        for subscription in targets:
+            subscription.loop.call_soon_threadsafe(subscription._put, message)
+
+    async def stream(self, subscription: Subscription,
+                     heartbeat: float = EVENT_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+        try:
+            yield f"retry: {EVENT_RETRY_MS}\n\n"
+            while True:
+                try:
+                    # asyncio.timeout rather than wait_for: no extra task per wait, and cancellation is never lost
+                    async with asyncio.timeout(heartbeat):
+                        message = await subscription.queue.get()
+                except TimeoutError:
+                    # Keeps proxies from timing the connection out and notices dead clients
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscription)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+event_hub = EventHub()
+
+REGISTRY.register(CallbackGauge("event_subscribers", "Open task event streams.", lambda: len(event_hub)))
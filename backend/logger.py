@@ -1,42 +1,118 @@
+import atexit
+import copy
+import gzip
+import itertools
 import logging
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+import os
+import queue
+import shutil
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+from .config import LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_LEVEL, LOG_LEVELS, LOG_SAMPLE_EVERY
+
+# Pass as `extra=SAMPLED` on high-volume success messages so only every LOG_SAMPLE_EVERY-th one is written
+SAMPLED = {"sampled": True}
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps every `every`-th record marked as sampled, counted per logger and message template."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(every, 1)
+        self._counters: Dict[tuple, itertools.count] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or not getattr(record, "sampled", False):
+            return True
+        counter = self._counters.setdefault((record.name, record.msg), itertools.count())
+        return next(counter) % self.every == 0
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueues records with their message merged; timestamps and tracebacks are formatted by the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
 
 
 class AppLogger:
 
-    _instance: Optional[logging.Logger] = None
+    _queue_handler: Optional[QueueHandler] = None
+    _listener: Optional[QueueListener] = None
+    _levels: Dict[str, int] = parse_levels(LOG_LEVELS)
 
     @classmethod
     def get_logger(cls, name: str) -> logging.Logger:
-        if cls._instance is None:
-            cls._instance = cls._setup_logger(name)
-        return cls._instance
-
-    @staticmethod
-    def _setup_logger(name: str) -> logging.Logger:
         logger = logging.getLogger(name)
+        if cls._queue_handler is None:
+            cls._start()
+        if cls._queue_handler not in logger.handlers:
+            logger.setLevel(cls._level_for(name))
+            logger.addHandler(cls._queue_handler)
+        return logger
 
-        if logger.handlers:
-            return logger
-
-        logger.setLevel(logging.INFO)
+    @classmethod
+    def _level_for(cls, name: str):
+        """Level of the most specific LOG_LEVELS entry covering `name` ("backend" covers "backend.crud")."""
+        parts = name.split(".")
+        for end in range(len(parts), 0, -1):
+            level = cls._levels.get(".".join(parts[:end]))
+            if level is not None:
+                return level
+        return logging.getLevelName(LOG_LEVEL.upper())
 
+    @classmethod
+    def _start(cls) -> None:
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
 
         file_handler = RotatingFileHandler(
-            'app.log',
-            maxBytes=1024 * 1024,
-            backupCount=5,
+            LOG_FILE,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
             encoding='utf-8'
         )
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
 
-        return logger
+        cls._queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+        cls._queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_EVERY))
+        cls._listener = QueueListener(cls._queue_handler.queue, file_handler, respect_handler_level=True)
+        cls._listener.start()
+        atexit.register(cls.stop)
+
+    @classmethod
+    def stop(cls) -> None:
+        """Flush queued records to disk and stop the background writer."""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
 
 
 def setup_logger(name: str) -> logging.Logger:
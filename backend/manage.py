@@ -0,0 +1,93 @@
+import argparse
+import sys
+from datetime import timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import crud, models
+from .config import TOMBSTONE_RETENTION_DAYS
+from .database import SessionLocal, engine
+from .logger import setup_logger
+from .migrations import prune_tombstones, rebuild_search_index, rebuild_task_stats, upgrade_schema
+
+logger = setup_logger(__name__)
+
+
+def move_attachments(db: Session, batch_size: int = 50) -> int:
+    """Move inline task_files.data blobs into the attachment storage, one row at a time."""
+    moved = 0
+    while True:
+        file_ids = crud.get_inline_task_file_ids(db, limit=batch_size)
+        if not file_ids:
+            break
+        for file_id in file_ids:
+            crud.move_task_file_to_storage(db, file_id)
+            moved += 1
+        db.commit()
+        logger.info("Moved %s attachments to storage", moved)
+    return moved
+
+
+def _move_attachments_command(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        moved = move_attachments(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Moved {moved} attachments")
+
+    if args.vacuum:
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+        print("Database vacuumed")
+
+
+def _rebuild_search_command(args: argparse.Namespace) -> None:
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
+        if args.optimize:
+            conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('optimize')"))
+    print("Task search index rebuilt")
+
+
+def _reconcile_stats_command(args: argparse.Namespace) -> None:
+    with engine.begin() as conn:
+        rebuild_task_stats(conn)
+    print("Task statistics recomputed")
+
+
+def _prune_tombstones_command(args: argparse.Namespace) -> None:
+    with engine.begin() as conn:
+        pruned = prune_tombstones(conn, models.now_moscow() - timedelta(days=args.days))
+    print(f"Pruned {pruned} tombstones")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    move_parser = commands.add_parser("move-attachments", help="move attachment blobs out of the database")
+    move_parser.add_argument("--batch-size", type=int, default=50)
+    move_parser.add_argument("--vacuum", action="store_true", help="run VACUUM afterwards to reclaim space")
+    move_parser.set_defaults(handler=_move_attachments_command)
+
+    search_parser = commands.add_parser("rebuild-search", help="re-index all tasks for full-text search")
+    search_parser.add_argument("--optimize", action="store_true", help="merge the index into a single segment")
+    search_parser.set_defaults(handler=_rebuild_search_command)
+
+    stats_parser = commands.add_parser("reconcile-stats", help="recompute the task statistics counters from scratch")
+    stats_parser.set_defaults(handler=_reconcile_stats_command)
+
+    prune_parser = commands.add_parser("prune-tombstones", help="forget deletions older than the retention period")
+    prune_parser.add_argument("--days", type=int, default=TOMBSTONE_RETENTION_DAYS)
+    prune_parser.set_defaults(handler=_prune_tombstones_command)
+
+    args = parser.parse_args(argv)
+    models.Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
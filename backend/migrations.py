@@ -0,0 +1,129 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .database import Base
+from .models import (
+    BLOB_REFS_DDL, CHANGE_FEED_DDL, COLLECTION_VERSION_DDL, TASK_SEARCH_DDL, TASK_STATS_DDL, TASK_STATS_DUE_DAY,
+    TASK_STATS_SCOPES
+)
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Indexes that models no longer declare and that only cost space and write time
+OBSOLETE_INDEXES = ("ix_tasks_title", "ix_tasks_description", "ix_tasks_user_id", "ix_tasks_created_by_id")
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Add columns and indexes that create_all() does not add to already existing tables."""
+    inspector = inspect(engine)
+    added = set()
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    logger.error("Cannot add NOT NULL column %s.%s without server default", table.name, column.name)
+                    continue
+                column_spec = f"{column.name} {column.type.compile(dialect=engine.dialect)}"
+                if column.server_default is not None:
+                    default = engine.dialect.ddl_compiler(engine.dialect, None).get_column_default_string(column)
+                    column_spec += f" DEFAULT {default}" + ("" if column.nullable else " NOT NULL")
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column_spec}'))
+                added.add((table.name, column.name))
+                logger.info("Added column %s.%s", table.name, column.name)
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+        for index_name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+        if inspector.has_table("tasks") and not inspector.has_table("tasks_fts"):
+            for statement in TASK_SEARCH_DDL:
+                conn.execute(text(statement))
+            rebuild_search_index(conn)
+            logger.info("Created and populated the task search index")
+
+        triggers = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+        if inspector.has_table("tasks") and "task_stats_ai" not in triggers:
+            for statement in TASK_STATS_DDL:
+                conn.execute(text(statement))
+            rebuild_task_stats(conn)
+            logger.info("Created and populated the task statistics counters")
+
+        if inspector.has_table("task_files") and "task_files_blob_ai" not in triggers:
+            for statement in BLOB_REFS_DDL:
+                conn.execute(text(statement))
+            rebuild_blob_refs(conn)
+            logger.info("Created and populated the attachment reference counts")
+
+        if inspector.has_table("tasks") and "tasks_version_ai" not in triggers:
+            for statement in COLLECTION_VERSION_DDL:
+                conn.execute(text(statement))
+            logger.info("Created the collection version triggers")
+
+        if ("tasks", "change_seq") in added:
+            # The version trigger used to fire on any column and would now also fire on change_seq bookkeeping
+            conn.execute(text("DROP TRIGGER IF EXISTS tasks_version_au"))
+            for statement in COLLECTION_VERSION_DDL + CHANGE_FEED_DDL:
+                conn.execute(text(statement))
+            backfill_change_feed(conn)
+            logger.info("Created the task change feed")
+
+
+def rebuild_search_index(conn) -> None:
+    """Re-index every task from the tasks table, e.g. after bulk changes made with triggers disabled."""
+    conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+
+
+def rebuild_task_stats(conn) -> None:
+    """Recompute task_stats from the tasks table."""
+    conn.execute(text("DELETE FROM task_stats"))
+    for scope, owner in TASK_STATS_SCOPES.items():
+        due_day = TASK_STATS_DUE_DAY.format(row="tasks")
+        conn.execute(text(
+            "INSERT INTO task_stats (scope, owner_id, status, priority, due_day, count) "
+            f"SELECT '{scope}', {owner}, coalesce(status, 0), priority, {due_day}, count(*) FROM tasks "
+            f"GROUP BY {owner}, coalesce(status, 0), priority, {due_day}"
+        ))
+
+
+def rebuild_blob_refs(conn) -> None:
+    """Recount the task_files rows of every attachment blob."""
+    conn.execute(text("DELETE FROM blob_refs"))
+    conn.execute(text(
+        "INSERT INTO blob_refs (blob_key, count) SELECT blob_key, count(*) FROM task_files "
+        "WHERE blob_key IS NOT NULL GROUP BY blob_key"
+    ))
+
+
+def backfill_change_feed(conn) -> None:
+    """Give tasks that predate the change feed a sequence number and move the counter past them."""
+    conn.execute(text(
+        "UPDATE tasks SET change_seq = id, updated_at = coalesce(updated_at, created_at) WHERE change_seq = 0"
+    ))
+    conn.execute(text(
+        "UPDATE change_sequence SET value = max(value, (SELECT coalesce(max(change_seq), 0) FROM tasks))"
+    ))
+
+
+def prune_tombstones(conn, older_than: datetime) -> int:
+    """Delete tombstones recorded before `older_than`; change cursors older than the last one expire."""
+    pruned = conn.execute(
+        text("SELECT count(*), max(change_seq) FROM tombstones WHERE deleted_at < :older_than"),
+        {"older_than": older_than.strftime("%Y-%m-%d %H:%M:%S")}
+    ).one()
+    if pruned[0]:
+        conn.execute(text("DELETE FROM tombstones WHERE change_seq <= :last"), {"last": pruned[1]})
+        conn.execute(
+            text("UPDATE change_sequence SET pruned_through = max(pruned_through, :last)"), {"last": pruned[1]}
+        )
+    return pruned[0]
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, LargeBinary, Index, DDL, event
+from sqlalchemy import column, insert_sentinel, table
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from email_validator import validate_email, EmailNotValidError
 
@@ -15,6 +16,9 @@ def now_moscow():
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -24,6 +28,8 @@ class User(Base):
     role = Column(String, default='default', nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     group_id = Column(Integer, default=0, nullable=False)
+    # Bumped by the COLLECTION_VERSION_DDL triggers; served as the ETag of the user's task views
+    collection_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     tasks = relationship("Task", back_populates="user", cascade="all, delete-orphan", foreign_keys="Task.user_id")
     created_tasks = relationship("Task", foreign_keys='Task.created_by_id', back_populates="created_by")
@@ -31,25 +37,39 @@ class User(Base):
     def validate_email(self) -> bool:
         try:
             validate_email(self.email)
-            logger.debug(f"Email validation successful for {self.email}")
+            logger.debug("Email validation successful for %s", self.email)
             return True
         except EmailNotValidError as e:
-            logger.warning(f"Invalid email {self.email}: {str(e)}")
+            logger.warning("Invalid email %s: %s", self.email, e)
             return False
 
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_tasks_created_by_id_created_at_id", "created_by_id", "created_at", "id"),
+        Index("ix_tasks_user_id_status_due_date", "user_id", "status", "due_date"),
+        Index("ix_tasks_created_by_id_status_due_date", "created_by_id", "status", "due_date"),
+        Index("ix_tasks_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_tasks_created_by_id_change_seq", "created_by_id", "change_seq"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True, nullable=False)
-    description = Column(String, index=True)
+    title = Column(String, nullable=False)
+    description = Column(String)
     status = Column(Integer, default=0)
     created_at = Column(DateTime, default=now_moscow, nullable=False)
     due_date = Column(DateTime, nullable=True)
     priority = Column(Integer, default=3, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    updated_at = Column(DateTime, default=now_moscow, onupdate=now_moscow, nullable=True)
+    # Set by the CHANGE_FEED_DDL triggers on every write to the task or its files
+    change_seq = Column(Integer, default=0, server_default="0", nullable=False)
+    # Numbers the rows of a batched INSERT ... RETURNING so SQLAlchemy can return ids in parameter
+    # order (SQLite has no implicit sentinel); only written by create_tasks_bulk
+    _sentinel = insert_sentinel()
 
     user = relationship("User", back_populates="tasks", foreign_keys=[user_id])
     created_by = relationship("User", back_populates="created_tasks", foreign_keys=[created_by_id])
@@ -58,24 +78,241 @@ class Task(Base):
     @classmethod
     def create_task(cls, **kwargs) -> "Task":
         try:
-            logger.info(f"Creating task with kwargs: {kwargs}")
+            logger.info("Creating task with kwargs: %s", kwargs)
             task = cls(**kwargs)
-            logger.info(f"Task created with priority {task.priority} (type: {type(task.priority)})")
+            logger.info("Task created with priority %s (type: %s)", task.priority, type(task.priority))
             return task
         except Exception as e:
-            logger.error(f"Error creating task: {e}")
+            logger.error("Error creating task: %s", e)
             raise
 
 
+# Full-text index over task titles and descriptions. It is an external-content FTS5 table
+# (no second copy of the text), kept in sync with `tasks` by triggers.
+TASK_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+task_search = table("tasks_fts", column("rowid"), column("title"), column("description"))
+
+for _statement in TASK_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create", DDL(_statement))
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts"))
+
+
+class TaskStat(Base):
+    """Task counts per owner, status, priority and due day, maintained by the triggers in TASK_STATS_DDL."""
+    __tablename__ = "task_stats"
+
+    # "assignee" rows are keyed by Task.user_id, "creator" rows by Task.created_by_id
+    scope = Column(String, primary_key=True)
+    owner_id = Column(Integer, primary_key=True)
+    status = Column(Integer, primary_key=True)
+    priority = Column(Integer, primary_key=True)
+    # YYYY-MM-DD of the due date of open tasks; '' for completed tasks and tasks without a due date
+    due_day = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+TASK_STATS_SCOPES = {"assignee": "user_id", "creator": "created_by_id"}
+TASK_STATS_DUE_DAY = "CASE WHEN {row}.status = 2 OR {row}.due_date IS NULL THEN '' ELSE date({row}.due_date) END"
+
+
+def _task_stats_change(row: str, delta: int) -> str:
+    statements = []
+    for scope, owner in TASK_STATS_SCOPES.items():
+        key = (f"'{scope}', {row}.{owner}, coalesce({row}.status, 0), {row}.priority, "
+               f"{TASK_STATS_DUE_DAY.format(row=row)}")
+        statements.append(
+            f"INSERT INTO task_stats (scope, owner_id, status, priority, due_day, count) VALUES ({key}, {delta}) "
+            "ON CONFLICT (scope, owner_id, status, priority, due_day) DO UPDATE SET count = count + excluded.count; "
+        )
+        if delta < 0:
+            statements.append(
+                f"DELETE FROM task_stats WHERE (scope, owner_id, status, priority, due_day) = ({key}) AND count = 0; "
+            )
+    return "".join(statements)
+
+
+# Keep task_stats in step with tasks inside the writing transaction, whatever statement changed the rows
+TASK_STATS_DDL = (
+    f"CREATE TRIGGER IF NOT EXISTS task_stats_ai AFTER INSERT ON tasks BEGIN {_task_stats_change('new', 1)}END",
+    f"CREATE TRIGGER IF NOT EXISTS task_stats_ad AFTER DELETE ON tasks BEGIN {_task_stats_change('old', -1)}END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_au "
+    "AFTER UPDATE OF status, priority, due_date, user_id, created_by_id ON tasks BEGIN "
+    f"{_task_stats_change('old', -1)}{_task_stats_change('new', 1)}END",
+)
+
+for _statement in TASK_STATS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(_statement))
+
+
 class TaskFile(Base):
     __tablename__ = "task_files"
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     content_type = Column(String, nullable=False)
-    data = Column(LargeBinary, nullable=False)
+    # Legacy inline storage; new uploads keep the bytes in backend.storage under blob_key.
+    # Deferred so that metadata queries and Task.files never pull blob bytes.
+    data = deferred(Column(LargeBinary, nullable=False, default=b""))
+    blob_key = Column(String(64), nullable=True, index=True)
     size = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=now_moscow, nullable=False)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
 
     task = relationship("Task", back_populates="files")
+
+
+class BlobRef(Base):
+    """Number of task_files rows per attachment blob, maintained by the triggers in BLOB_REFS_DDL."""
+    __tablename__ = "blob_refs"
+
+    blob_key = Column(String(64), primary_key=True)
+    # Rows at zero are left for crud.release_blobs to collect together with the blob itself
+    count = Column(Integer, nullable=False, default=0)
+
+
+def _blob_ref_change(key: str, delta: int) -> str:
+    return (
+        f"INSERT INTO blob_refs (blob_key, count) SELECT {key}, {delta} WHERE {key} IS NOT NULL "
+        "ON CONFLICT (blob_key) DO UPDATE SET count = count + excluded.count; "
+    )
+
+
+# Counted in the transaction that adds or removes the reference, so a blob is collected only
+# while nothing refers to it
+BLOB_REFS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_files_blob_ai AFTER INSERT ON task_files BEGIN "
+    f"{_blob_ref_change('new.blob_key', 1)}END",
+    "CREATE TRIGGER IF NOT EXISTS task_files_blob_ad AFTER DELETE ON task_files BEGIN "
+    f"{_blob_ref_change('old.blob_key', -1)}END",
+    "CREATE TRIGGER IF NOT EXISTS task_files_blob_au AFTER UPDATE OF blob_key ON task_files BEGIN "
+    f"{_blob_ref_change('old.blob_key', -1)}{_blob_ref_change('new.blob_key', 1)}END",
+)
+
+for _statement in BLOB_REFS_DDL:
+    event.listen(TaskFile.__table__, "after_create", DDL(_statement))
+
+
+def _bump_versions(user_ids: str) -> str:
+    return f"UPDATE users SET collection_version = collection_version + 1 WHERE id IN ({user_ids}); "
+
+
+def _bump_versions_of_task(task_id: str) -> str:
+    return _bump_versions(
+        f"SELECT user_id FROM tasks WHERE id = {task_id} UNION SELECT created_by_id FROM tasks WHERE id = {task_id}"
+    )
+
+
+# Columns whose changes are visible to clients; the bookkeeping columns written by triggers are left out
+TASK_CONTENT_COLUMNS = "title, description, status, due_date, priority, user_id, created_by_id"
+
+
+# Any write to a task, its files or the user's own profile changes what the user's task views return
+COLLECTION_VERSION_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS tasks_version_ai AFTER INSERT ON tasks BEGIN "
+    f"{_bump_versions('new.user_id, new.created_by_id')}END",
+    f"CREATE TRIGGER IF NOT EXISTS tasks_version_au AFTER UPDATE OF {TASK_CONTENT_COLUMNS} ON tasks BEGIN "
+    f"{_bump_versions('old.user_id, old.created_by_id, new.user_id, new.created_by_id')}END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_version_ad AFTER DELETE ON tasks BEGIN "
+    f"{_bump_versions('old.user_id, old.created_by_id')}END",
+    "CREATE TRIGGER IF NOT EXISTS task_files_version_ai AFTER INSERT ON task_files BEGIN "
+    f"{_bump_versions_of_task('new.task_id')}END",
+    "CREATE TRIGGER IF NOT EXISTS task_files_version_au AFTER UPDATE OF filename, content_type, size, task_id "
+    f"ON task_files BEGIN {_bump_versions_of_task('old.task_id')}{_bump_versions_of_task('new.task_id')}END",
+    "CREATE TRIGGER IF NOT EXISTS task_files_version_ad AFTER DELETE ON task_files BEGIN "
+    f"{_bump_versions_of_task('old.task_id')}END",
+    "CREATE TRIGGER IF NOT EXISTS users_version_au AFTER UPDATE OF email, role, is_active, group_id ON users "
+    f"BEGIN {_bump_versions('new.id')}END",
+)
+
+for _statement in COLLECTION_VERSION_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement))
+
+
+class ChangeSequence(Base):
+    """Single-row counter handing out the change_seq of task writes and tombstones."""
+    __tablename__ = "change_sequence"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    # Tombstones up to this sequence number have been pruned; older cursors must resync
+    pruned_through = Column(Integer, nullable=False, default=0)
+
+
+class Tombstone(Base):
+    """A deleted task or file, or a task that left a user's view, as seen by GET /tasks/changes."""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_tombstones_created_by_id_change_seq", "created_by_id", "change_seq"),
+        Index("ix_tombstones_deleted_at", "deleted_at"),
+    )
+
+    change_seq = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # "task" or "file"
+    object_id = Column(Integer, nullable=False)
+    task_id = Column(Integer, nullable=False)
+    # Owners of the task at the time, so the tombstone reaches the users who could see it
+    user_id = Column(Integer, nullable=True)
+    created_by_id = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime, default=now_moscow, nullable=False)
+
+
+_NEXT_CHANGE = "UPDATE change_sequence SET value = value + 1"
+
+
+def _touch_task(task_id: str) -> str:
+    return f"{_NEXT_CHANGE}; UPDATE tasks SET change_seq = (SELECT value FROM change_sequence) WHERE id = {task_id}; "
+
+
+def _owners_of_task(task_id: str) -> str:
+    return f"(SELECT user_id FROM tasks WHERE id = {task_id}), (SELECT created_by_id FROM tasks WHERE id = {task_id})"
+
+
+_OWNERS_CHANGED = "old.user_id IS NOT new.user_id OR old.created_by_id IS NOT new.created_by_id"
+
+
+def _tombstone(kind: str, object_id: str, task_id: str, owners: str, when: str = "1") -> str:
+    return (
+        f"{_NEXT_CHANGE} WHERE {when}; "
+        "INSERT INTO tombstones (change_seq, kind, object_id, task_id, user_id, created_by_id, deleted_at) "
+        f"SELECT value, '{kind}', {object_id}, {task_id}, {owners}, datetime('now', 'localtime') "
+        f"FROM change_sequence WHERE {when}; "
+    )
+
+
+# Every write gets the next number of one global sequence. SQLite serialises writers, so numbers
+# become visible in order and "everything after N" never skips a row committed later.
+CHANGE_FEED_DDL = (
+    "INSERT OR IGNORE INTO change_sequence (id, value, pruned_through) VALUES (1, 0, 0)",
+    "CREATE TRIGGER IF NOT EXISTS tasks_change_ai AFTER INSERT ON tasks BEGIN "
+    f"{_touch_task('new.id')}END",
+    f"CREATE TRIGGER IF NOT EXISTS tasks_change_au AFTER UPDATE OF {TASK_CONTENT_COLUMNS} ON tasks BEGIN "
+    # A reassigned task leaves the view of its previous owners
+    f"{_tombstone('task', 'old.id', 'old.id', 'old.user_id, old.created_by_id', when=_OWNERS_CHANGED)}"
+    f"{_touch_task('new.id')}END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_change_ad AFTER DELETE ON tasks BEGIN "
+    f"{_tombstone('task', 'old.id', 'old.id', 'old.user_id, old.created_by_id')}END",
+    "CREATE TRIGGER IF NOT EXISTS task_files_change_ai AFTER INSERT ON task_files BEGIN "
+    f"{_touch_task('new.task_id')}END",
+    "CREATE TRIGGER IF NOT EXISTS task_files_change_au AFTER UPDATE OF filename, content_type, size, task_id "
+    f"ON task_files BEGIN {_touch_task('old.task_id')}{_touch_task('new.task_id')}END",
+    "CREATE TRIGGER IF NOT EXISTS task_files_change_ad AFTER DELETE ON task_files BEGIN "
+    f"{_tombstone('file', 'old.id', 'old.task_id', _owners_of_task('old.task_id'))}"
+    f"{_touch_task('old.task_id')}END",
+)
+
+for _statement in CHANGE_FEED_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement))
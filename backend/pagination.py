@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional, Sequence
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: int
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return Cursor(datetime.fromisoformat(created_at), int(item_id))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def next_cursor(items: Sequence, limit: int) -> Optional[str]:
+    """Cursor after the page of `limit` items, given up to `limit + 1` fetched rows; None on the last page."""
+    if limit <= 0 or len(items) <= limit:
+        return None
+    last = items[limit - 1]
+    return encode_cursor(last.created_at, last.id)
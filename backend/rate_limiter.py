@@ -1,84 +1,324 @@
-from datetime import datetime, timedelta
-from typing import Dict
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, NamedTuple, Optional
+import heapq
+import math
+import sqlite3
+import threading
 import time
 
 from fastapi import HTTPException, status
 
+from .config import RATE_LIMIT_BACKEND, RATE_LIMIT_DB, RATE_LIMIT_MAX_ENTRIES
 from .logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+class AttemptRecord(NamedTuple):
+    """Fixed-size sliding-window counter: two fixed windows plus the last attempt and block times."""
+    window_start: float
+    current: int
+    previous: int
+    last_attempt: float
+    blocked_until: float
+
+    def rotate(self, now: float, window: float) -> "AttemptRecord":
+        elapsed_windows = int((now - self.window_start) // window)
+        if elapsed_windows <= 0:
+            return self
+        previous = self.current if elapsed_windows == 1 else 0
+        return self._replace(
+            window_start=self.window_start + elapsed_windows * window,
+            current=0,
+            previous=previous
+        )
+
+    def estimate(self, now: float, window: float) -> int:
+        weight = 1 - (now - self.window_start) / window
+        return math.ceil(self.previous * max(weight, 0) + self.current)
+
+
+RecordUpdate = Callable[[Optional[AttemptRecord]], Optional[AttemptRecord]]
+
+
+class RateLimitStore:
+    """Storage backend of RateLimiter; update() is an atomic read-modify-write of one key."""
+
+    def get(self, key: str) -> Optional[AttemptRecord]:
+        raise NotImplementedError
+
+    def update(self, key: str, fn: RecordUpdate, ttl: float) -> Optional[AttemptRecord]:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class RateLimitStoreFull(Exception):
+    """Raised when a new key cannot be tracked because every tracked key is under a live block."""
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process store bounded by a TTL and a cap on the number of tracked keys.
+
+    Expired records are dropped in expiry order. Over the cap the least recently used unblocked
+    record makes room; a live block is never dropped, so once only blocks are left a new key is
+    refused with RateLimitStoreFull.
+    """
+
+    def __init__(self, max_entries: int = RATE_LIMIT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # Unblocked records in LRU order and records under a block, each with its expiry time
+        self._entries: "OrderedDict[str, tuple[AttemptRecord, float]]" = OrderedDict()
+        self._blocked: "dict[str, tuple[AttemptRecord, float]]" = {}
+        # (expires_at, key) of every write; entries superseded by a later write are skipped
+        self._expiry: "list[tuple[float, str]]" = []
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str) -> Optional[tuple[AttemptRecord, float]]:
+        entry = self._entries.get(key)
+        return entry if entry is not None else self._blocked.get(key)
+
+    def _pop(self, key: str) -> Optional[tuple[AttemptRecord, float]]:
+        entry = self._entries.pop(key, None)
+        return entry if entry is not None else self._blocked.pop(key, None)
+
+    def _sweep(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._lookup(key)
+            if entry is not None and entry[1] == expires_at:
+                self._pop(key)
+        if len(self._expiry) > 2 * len(self) + 1024:
+            self._expiry = [(entry[1], key) for entries in (self._entries, self._blocked)
+                            for key, entry in entries.items()]
+            heapq.heapify(self._expiry)
+
+    def get(self, key: str) -> Optional[AttemptRecord]:
+        now = time.time()
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None or entry[1] <= now:
+                return None
+            return entry[0]
+
+    def update(self, key: str, fn: RecordUpdate, ttl: float) -> Optional[AttemptRecord]:
+        now = time.time()
+        with self._lock:
+            self._sweep(now)
+            entry = self._pop(key)
+            record = fn(entry[0] if entry is not None and entry[1] > now else None)
+            if record is None:
+                return None
+            if entry is None and len(self) >= self.max_entries:
+                if not self._entries:
+                    raise RateLimitStoreFull(key)
+                self._entries.popitem(last=False)
+            entries = self._blocked if record.blocked_until > now else self._entries
+            entries[key] = (record, now + ttl)
+            heapq.heappush(self._expiry, (now + ttl, key))
+            return record
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._blocked.clear()
+            self._expiry.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._blocked)
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """Store shared by all worker processes on one host through a small WAL-mode SQLite file."""
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, path: str = RATE_LIMIT_DB):
+        self.path = path
+        self._local = threading.local()
+        self._updates = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window_start REAL NOT NULL, current INTEGER NOT NULL, "
+                "previous INTEGER NOT NULL, last_attempt REAL NOT NULL, blocked_until REAL NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limits_expires_at ON rate_limits (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[AttemptRecord]:
+        row = self._connect().execute(
+            "SELECT window_start, current, previous, last_attempt, blocked_until FROM rate_limits "
+            "WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return AttemptRecord(*row) if row else None
+
+    def update(self, key: str, fn: RecordUpdate, ttl: float) -> Optional[AttemptRecord]:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, current, previous, last_attempt, blocked_until FROM rate_limits "
+                "WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            record = fn(AttemptRecord(*row) if row else None)
+            if record is None:
+                conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits "
+                    "(key, window_start, current, previous, last_attempt, blocked_until, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, *record, now + ttl)
+                )
+            self._updates += 1
+            if self._updates % self.SWEEP_EVERY == 0:
+                conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return record
+
+    def delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM rate_limits")
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+
+def create_store(backend: str = RATE_LIMIT_BACKEND) -> RateLimitStore:
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    if backend == "sqlite":
+        return SQLiteRateLimitStore()
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
 class RateLimiter:
-    def __init__(self):
-        self.attempts: Dict[str, list] = {}
-        self.blocked_until: Dict[str, datetime] = {}
+    def __init__(self, store: Optional[RateLimitStore] = None):
+        self.store = store if store is not None else create_store()
         self.max_attempts = 5
         self.block_duration = timedelta(minutes=15)
         self.attempt_window = timedelta(minutes=5)
         self.progressive_delay = 2
 
+    @property
+    def _ttl(self) -> float:
+        return max(2 * self.attempt_window.total_seconds(), self.block_duration.total_seconds())
+
     def check_rate_limit(self, email: str) -> None:
-        current_time = datetime.now()
-
-        if email in self.blocked_until:
-            if current_time < self.blocked_until[email]:
-                remaining_time = (self.blocked_until[email] - current_time).total_seconds()
-                logger.warning(f"Login attempt from blocked email: {email}")
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Слишком много попыток. Попробуйте через {int(remaining_time)} секунд"
+        current_time = time.time()
+        window = self.attempt_window.total_seconds()
+        record = self.store.get(email)
+        if record is None:
+            return
+
+        if record.blocked_until:
+            if current_time < record.blocked_until:
+                remaining_time = record.blocked_until - current_time
+                logger.warning("Login attempt from blocked email: %s", email)
+                raise self._too_many_attempts(
+                    f"Слишком много попыток. Попробуйте через {int(remaining_time)} секунд",
+                    remaining_time
                 )
-            else:
-                del self.blocked_until[email]
-                self.attempts[email] = []
-
-        if email in self.attempts:
-            self.attempts[email] = [
-                attempt for attempt in self.attempts[email]
-                if current_time - attempt < self.attempt_window
-            ]
-
-        if email in self.attempts:
-            num_attempts = len(self.attempts[email])
-            if num_attempts > 0:
-                delay = self.progressive_delay ** (num_attempts - 1)
-                logger.info(f"Applying progressive delay of {delay} seconds for {email}")
-                time.sleep(delay)
-
-            if num_attempts >= self.max_attempts:
-                self.blocked_until[email] = current_time + self.block_duration
-                logger.warning(f"Email {email} blocked due to too many attempts")
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Слишком много попыток. Аккаунт заблокирован на {self.block_duration.seconds // 60} минут"
+            self.store.delete(email)
+            return
+
+        num_attempts = record.rotate(current_time, window).estimate(current_time, window)
+        if num_attempts > 0:
+            delay = self.progressive_delay ** (num_attempts - 1)
+            retry_after = record.last_attempt + delay - current_time
+            if retry_after > 0:
+                logger.info("Rejecting %s for %.1fs of progressive delay", email, retry_after)
+                raise self._too_many_attempts(
+                    f"Слишком много попыток. Попробуйте через {math.ceil(retry_after)} секунд",
+                    retry_after
+                )
+
+        if num_attempts >= self.max_attempts:
+            blocked_until = current_time + self.block_duration.total_seconds()
+            try:
+                self.store.update(
+                    email,
+                    lambda existing: (existing or record)._replace(blocked_until=blocked_until),
+                    self._ttl
                 )
+            except RateLimitStoreFull:
+                logger.warning("Rate limit store is full; %s is rejected without being tracked", email)
+            logger.warning("Email %s blocked due to too many attempts", email)
+            raise self._too_many_attempts(
+                f"Слишком много попыток. Аккаунт заблокирован на {self.block_duration.seconds // 60} минут",
+                self.block_duration.total_seconds()
+            )
+
+    @staticmethod
+    def _too_many_attempts(detail: str, retry_after: float) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))}
+        )
 
     def add_attempt(self, email: str) -> None:
-        current_time = datetime.now()
-        if email not in self.attempts:
-            self.attempts[email] = []
-        self.attempts[email].append(current_time)
-        logger.info(f"Added login attempt for {email}. Total attempts: {len(self.attempts[email])}")
+        current_time = time.time()
+        window = self.attempt_window.total_seconds()
+
+        def record_attempt(record: Optional[AttemptRecord]) -> AttemptRecord:
+            if record is None:
+                return AttemptRecord(current_time, 1, 0, current_time, 0.0)
+            record = record.rotate(current_time, window)
+            return record._replace(current=record.current + 1, last_attempt=current_time)
+
+        try:
+            record = self.store.update(email, record_attempt, self._ttl)
+        except RateLimitStoreFull:
+            logger.warning("Rate limit store is full; rejecting untracked %s", email)
+            raise self._too_many_attempts(
+                "Слишком много попыток. Попробуйте позже", self.attempt_window.total_seconds()
+            )
+        logger.info("Added login attempt for %s. Total attempts: %s", email, record.estimate(current_time, window))
 
     def reset_attempts(self, email: str) -> None:
-        if email in self.attempts:
-            del self.attempts[email]
-        if email in self.blocked_until:
-            del self.blocked_until[email]
-        logger.info(f"Reset attempts for {email}")
+        self.store.delete(email)
+        logger.info("Reset attempts for %s", email)
 
     def reset(self, email: str = None) -> None:
         if email:
             self.reset_attempts(email)
         else:
-            self.attempts.clear()
-            self.blocked_until.clear()
+            self.store.clear()
             logger.info("Reset all rate limiting data")
 
     def reset_all(self):
-        self.attempts.clear()
-        self.blocked_until.clear()
+        self.store.clear()
 
 
 rate_limiter = RateLimiter()
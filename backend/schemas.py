@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import List, Optional
-from enum import IntEnum
+from typing import Any, Dict, List, Optional, Union
+from enum import Enum, IntEnum
 
 from pydantic import BaseModel, EmailStr, Field, field_validator, ConfigDict
 
@@ -15,6 +15,9 @@ class TaskStatus(IntEnum):
     COMPLETE = 2
 
 
+TASK_STATUS_VALUES = frozenset(status.value for status in TaskStatus)
+
+
 class TaskBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=1000)
@@ -25,11 +28,31 @@ class TaskBase(BaseModel):
     @field_validator('status')
     @classmethod
     def validate_status(cls, v: int) -> int:
-        if v not in [status.value for status in TaskStatus]:
+        if v not in TASK_STATUS_VALUES:
             raise ValueError('Статус должен быть 0 (Proposed), 1 (In Progress) или 2 (Complete)')
         return v
 
 
+class TaskSort(str, Enum):
+    CREATED_DESC = "-created_at"
+    CREATED_ASC = "created_at"
+    DUE_DATE_ASC = "due_date"
+    DUE_DATE_DESC = "-due_date"
+    PRIORITY_ASC = "priority"
+    PRIORITY_DESC = "-priority"
+
+
+class TaskFilters(BaseModel):
+    """Query parameters of the task list endpoints."""
+    status: Optional[List[int]] = None
+    priority_min: Optional[int] = Field(None, ge=1, le=4)
+    priority_max: Optional[int] = Field(None, ge=1, le=4)
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+    overdue: bool = False
+    sort: TaskSort = TaskSort.CREATED_DESC
+
+
 class UserBase(BaseModel):
     email: EmailStr
 
@@ -41,9 +64,9 @@ class TaskCreate(TaskBase):
     @classmethod
     def validate_due_date(cls, v: datetime | None) -> datetime | None:
         if v and v < datetime.now():
-            logger.warning(f"Invalid due date: {v} is in the past")
+            logger.warning("Invalid due date: %s is in the past", v)
             raise ValueError('Дата и время выполнения не могут быть в прошлом')
-        logger.debug(f"Due date validation successful: {v}")
+        logger.debug("Due date validation successful: %s", v)
         return v
 
 
@@ -65,6 +88,55 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
 
 
+class TaskBulkCreate(BaseModel):
+    # Items are validated one by one against TaskCreate so that errors can be reported per item
+    tasks: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+    atomic: bool = True
+
+
+class TaskBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class TaskBulkCreateResponse(BaseModel):
+    ids: List[int]
+    errors: List[TaskBulkError] = []
+
+
+class TaskBulkChanges(TaskUpdate):
+    # Only the fields sent are applied: title may be left out, but not set to null
+    title: str = Field(None, min_length=1, max_length=100)
+
+
+class TaskBulkUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    changes: TaskBulkChanges
+
+
+class TaskBulkUpdateResponse(BaseModel):
+    updated: List[int]
+    not_found: List[int]
+
+
+class TaskBulkReassign(BaseModel):
+    from_user_id: int
+    to_user_id: int
+    status: Optional[int] = None
+    due_before: Optional[datetime] = None
+    due_after: Optional[datetime] = None
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, v: Optional[int]) -> Optional[int]:
+        return v if v is None else TaskBase.validate_status(v)
+
+
+class TaskBulkReassignResponse(BaseModel):
+    count: int
+    ids: List[int]
+
+
 class TaskStatusUpdate(BaseModel):
     completed: bool
 
@@ -107,6 +179,7 @@ class TaskFileResponse(TaskFileBase):
 class TaskResponse(TaskBase):
     id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
     user_id: int
     created_by_id: int
     files: List[TaskFileResponse] = []
@@ -115,6 +188,55 @@ class TaskResponse(TaskBase):
         from_attributes = True
 
 
+class TaskView(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+class TaskSummary(BaseModel):
+    """Task as a board card shows it: `view=summary` of the task listings."""
+    id: int
+    title: str
+    status: int
+    priority: int
+    due_date: Optional[datetime] = None
+
+
+class TaskPartial(BaseModel):
+    """Task limited to the `fields=` of the request; only id is always present."""
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[int] = None
+    due_date: Optional[datetime] = None
+    priority: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+    created_by_id: Optional[int] = None
+    files: Optional[List[TaskFileResponse]] = None
+
+
+# Items of the task listings: complete by default, TaskSummary for view=summary, TaskPartial for fields=
+TaskProjection = Union[TaskResponse, TaskSummary, TaskPartial]
+
+
+class TaskChanges(BaseModel):
+    """Changes after a cursor: pass `cursor` back as `since` to get the next batch."""
+    tasks: List[TaskResponse]
+    deleted_tasks: List[int]
+    deleted_files: List[int]
+    cursor: int
+    has_more: bool
+
+
+class TaskSearchHit(BaseModel):
+    task: TaskResponse
+    # HTML: escaped task text with matches wrapped in <mark>
+    snippet: str
+    rank: float
+
+
 class UserResponse(UserBase):
     id: int
     created_at: datetime
@@ -125,17 +247,62 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class Principal(UserResponse):
+    """The authenticated user as cached between requests; it carries no credentials."""
+
+
+class UserSummary(UserResponse):
+    tasks_count: int
+    created_tasks_count: int
+
+
+class TaskCounts(BaseModel):
+    total: int = 0
+    by_status: Dict[int, int] = Field(default_factory=lambda: {status.value: 0 for status in TaskStatus})
+    by_priority: Dict[int, int] = Field(default_factory=lambda: {priority: 0 for priority in range(1, 5)})
+    # Open tasks due before today (as the overdue list filter) and due today
+    overdue: int = 0
+    due_today: int = 0
+
+
+class TaskStats(BaseModel):
+    assigned: TaskCounts
+    # Tasks the user handed out; only reported for PMs
+    created: Optional[TaskCounts] = None
+
+
 class User(UserResponse):
     tasks: List[TaskResponse] = []
     created_tasks: List[TaskResponse] = []
 
 
+class UserWithTaskProjections(UserResponse):
+    """GET /users/me/: the tasks take the shape selected by `fields=` or `view=`."""
+    tasks: List[TaskProjection] = []
+    created_tasks: List[TaskProjection] = []
+
+
+class PasswordPoolStats(BaseModel):
+    pool_size: int
+    queue_limit: int
+    running: int
+    queued: int
+    completed_total: int
+    rejected_total: int
+    busy_seconds_total: float
+
+
 class Token(BaseModel):
     access_token: str
     refresh_token: str
     token_type: str
 
 
+class EventTicket(BaseModel):
+    ticket: str
+    expires_in: int
+
+
 class TokenData(BaseModel):
     email: Optional[str] = None
 
@@ -0,0 +1,27 @@
+import html
+import re
+
+# Word characters only, so user input can never inject FTS5 operators or column filters
+_TERM_RE = re.compile(r"\w+\*?")
+
+# snippet() copies task text verbatim, so it marks matches with private-use characters rather than
+# HTML; highlight_snippet escapes the text and only then turns the markers into <mark> tags
+SNIPPET_START = "\ue000"
+SNIPPET_END = "\ue001"
+SNIPPET_TOKENS = 12
+
+
+def build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 MATCH expression: all terms required, `term*` is a prefix match."""
+    terms = []
+    for token in _TERM_RE.findall(query):
+        word = token.rstrip("*")
+        terms.append(f'"{word}"*' if token.endswith("*") else f'"{word}"')
+    if not terms:
+        raise ValueError(f"No search terms in: {query}")
+    return " ".join(terms)
+
+
+def highlight_snippet(snippet: str) -> str:
+    """HTML-safe snippet: the task text escaped, matches wrapped in <mark>."""
+    return html.escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
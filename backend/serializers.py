@@ -0,0 +1,70 @@
+"""Direct ORM-to-JSON encoding for large read responses.
+
+Rows loaded from the database already satisfy the response schemas, so the list endpoints copy
+them attribute by attribute into plain dicts and encode those with orjson instead of validating
+every row into a pydantic model first. The output is the JSON the response models produce;
+tests/test_serializers.py compares the two.
+"""
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, Tuple
+
+import orjson
+from fastapi.responses import Response
+
+from . import models, schemas
+
+TASK_RESPONSE_FIELDS = tuple(schemas.TaskResponse.model_fields)
+TASK_SUMMARY_FIELDS = tuple(schemas.TaskSummary.model_fields)
+TASK_FILE_FIELDS = tuple(schemas.TaskFileResponse.model_fields)
+USER_FIELDS = tuple(schemas.UserResponse.model_fields)
+
+
+def _values_getter(names: Tuple[str, ...]) -> Callable[[Any], tuple]:
+    if len(names) == 1:
+        # attrgetter of a single name returns the value itself rather than a 1-tuple
+        name = names[0]
+        return lambda obj: (getattr(obj, name),)
+    return attrgetter(*names)
+
+
+_task_file_values = _values_getter(TASK_FILE_FIELDS)
+_user_values = _values_getter(USER_FIELDS)
+
+
+@lru_cache(maxsize=128)
+def task_serializer(fields: Tuple[str, ...] = TASK_RESPONSE_FIELDS) -> Callable[[models.Task], dict]:
+    """Function building the `fields` of TaskResponse from a task; reads only those attributes."""
+    columns = tuple(name for name in fields if name != "files")
+    task_values = _values_getter(columns)
+
+    if "files" not in fields:
+        return lambda task: dict(zip(columns, task_values(task)))
+
+    def serialize(task: models.Task) -> dict:
+        data = dict(zip(columns, task_values(task)))
+        data["files"] = [dict(zip(TASK_FILE_FIELDS, _task_file_values(file))) for file in task.files]
+        return data
+    return serialize
+
+
+def task_to_dict(task: models.Task) -> dict:
+    """TaskResponse of a task whose files are loaded."""
+    return task_serializer()(task)
+
+
+def tasks_to_list(tasks: Iterable[models.Task], fields: Tuple[str, ...] = TASK_RESPONSE_FIELDS) -> List[dict]:
+    serialize = task_serializer(fields)
+    return [serialize(task) for task in tasks]
+
+
+def user_to_dict(user: models.User) -> dict:
+    """UserResponse of a user."""
+    return dict(zip(USER_FIELDS, _user_values(user)))
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import uuid
+from typing import BinaryIO, NamedTuple, Optional
+
+import aiofiles
+from fastapi import UploadFile
+
+from .config import ATTACHMENT_STORAGE, ATTACHMENT_DIR, ATTACHMENT_CHUNK_SIZE
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class StoredBlob(NamedTuple):
+    key: str
+    size: int
+
+
+class FileTooLargeError(ValueError):
+    pass
+
+
+class BlobMissingError(LookupError):
+    """A reused blob was collected before the row referencing it was committed; store it again."""
+
+
+class AttachmentStorage:
+    """Interface of attachment blob backends; blobs are addressed by an opaque key."""
+
+    async def save(self, upload: UploadFile, max_size: int) -> StoredBlob:
+        raise NotImplementedError
+
+    def save_bytes(self, data: bytes) -> StoredBlob:
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        return None
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalFileStorage(AttachmentStorage):
+    """Content-addressed store: each blob lives at <root>/<sha[:2]>/<sha[2:4]>/<sha256>."""
+
+    def __init__(self, root: str, chunk_size: int = ATTACHMENT_CHUNK_SIZE):
+        self.root = root
+        self.chunk_size = chunk_size
+
+    def _path(self, key: str) -> str:
+        if len(key) != 64 or any(c not in '0123456789abcdef' for c in key):
+            raise ValueError(f"Invalid blob key: {key}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def _tmp_path(self) -> str:
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        return os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    def _commit(self, tmp_path: str, key: str) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            logger.info("Blob %s already stored, reusing it", key)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+    async def save(self, upload: UploadFile, max_size: int) -> StoredBlob:
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = self._tmp_path()
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as out:
+                while chunk := await upload.read(self.chunk_size):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise FileTooLargeError(f"Upload exceeds {max_size} bytes")
+                    digest.update(chunk)
+                    await out.write(chunk)
+            key = digest.hexdigest()
+            self._commit(tmp_path, key)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info("Stored blob %s (%s bytes)", key, size)
+        return StoredBlob(key, size)
+
+    def save_bytes(self, data: bytes) -> StoredBlob:
+        key = hashlib.sha256(data).hexdigest()
+        if not self.exists(key):
+            tmp_path = self._tmp_path()
+            with open(tmp_path, 'wb') as out:
+                out.write(data)
+            self._commit(tmp_path, key)
+        return StoredBlob(key, len(data))
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), 'rb')
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+            logger.info("Deleted blob %s", key)
+        except FileNotFoundError:
+            logger.warning("Blob %s was already removed", key)
+
+
+STORAGE_BACKENDS = {
+    'local': lambda: LocalFileStorage(ATTACHMENT_DIR),
+}
+
+
+def create_storage(backend: str = ATTACHMENT_STORAGE) -> AttachmentStorage:
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown attachment storage backend: {backend}")
+    return STORAGE_BACKENDS[backend]()
+
+
+storage = create_storage()
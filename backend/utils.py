@@ -1,15 +1,17 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 import os
 import mimetypes
 
 import backend.crud as crud
 import backend.schemas as schemas
-from backend.database import SessionLocal
+from backend.database import AsyncReadSessionLocal, AsyncSessionLocal, SessionLocal
 from backend.config import ADMIN_EMAIL, ADMIN_PASSWORD, ADMIN_SECRET_WORD
 from backend.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
 
 def create_admin_user() -> None:
     db = SessionLocal()
@@ -34,6 +36,16 @@ def create_admin_user() -> None:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator:
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
@@ -47,14 +59,6 @@ def get_content_type(filename: str) -> str:
     return content_type or 'application/octet-stream'
 
 
-def get_file_size(file_data: bytes) -> int:
-    return len(file_data)
-
-
-def validate_file_size(file_size: int, max_size: int = 10 * 1024 * 1024) -> bool:
-    return file_size <= max_size
-
-
 def validate_file_type(filename: str) -> bool:
     allowed_extensions = {'.pdf', '.doc', '.docx', '.jpg', '.jpeg', '.png', '.gif'}
     file_extension = os.path.splitext(filename)[1].lower()
@@ -0,0 +1,52 @@
+"""Creating a sprint of tasks one commit at a time versus one batched insert.
+
+Run from the repository root:
+
+    python -m benchmarks.bulk_create --tasks 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+from backend.database import build_engine
+
+
+def fresh_session() -> Session:
+    engine = build_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    models.Base.metadata.create_all(bind=engine)
+    db = Session(engine)
+    db.add(models.User(email="pm@example.com", password_hash="x", secret_word="x", role="pm"))
+    db.commit()
+    return db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500)
+    args = parser.parse_args()
+    tasks = [schemas.TaskCreate(title=f"Sprint task {i}", priority=i % 4 + 1) for i in range(args.tasks)]
+
+    db = fresh_session()
+    started = time.perf_counter()
+    for task in tasks:
+        crud.create_task(db, task, user_id=1, created_by_id=1)
+    loop = time.perf_counter() - started
+    db.close()
+
+    db = fresh_session()
+    started = time.perf_counter()
+    crud.create_tasks_bulk(db, [crud.task_values(task, 1, 1) for task in tasks])
+    bulk = time.perf_counter() - started
+    db.close()
+
+    print(f"create_task loop:  {loop * 1000:9.1f} ms")
+    print(f"create_tasks_bulk: {bulk * 1000:9.1f} ms")
+    print(f"speedup:           {loop / bulk:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
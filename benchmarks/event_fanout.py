@@ -0,0 +1,58 @@
+"""Memory held by idle event streams and the cost of fanning one event out to many of them.
+
+Each simulated connection is a subscription plus a task consuming its stream, which is what
+an open /events request amounts to inside a worker (the socket itself is left out).
+
+    python -m benchmarks.event_fanout --connections 5000 --users 500
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from backend.events import EventHub
+
+
+async def consume(stream) -> int:
+    received = 0
+    async for _ in stream:
+        received += 1
+    return received
+
+
+async def run(connections: int, users: int, events: int) -> None:
+    hub = EventHub()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    consumers = [
+        asyncio.create_task(consume(hub.stream(hub.subscribe(index % users), heartbeat=3600)))
+        for index in range(connections)
+    ]
+    await asyncio.sleep(0)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{connections} idle streams: {held / 1024 / 1024:.1f} MiB, {held / connections / 1024:.1f} KiB each")
+
+    started = time.perf_counter()
+    for index in range(events):
+        hub.publish("task_updated", [index % users], {"task_id": index, "task": {"title": "x" * 200}})
+    await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    print(f"{events} events to {connections // users} streams each: {elapsed / events * 1e6:.1f} us/event")
+
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--events", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.connections, args.users, args.events))
+
+
+if __name__ == "__main__":
+    main()
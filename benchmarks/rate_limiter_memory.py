@@ -0,0 +1,50 @@
+"""Memory use of the login rate limiter under a flood of distinct emails.
+
+Run from the repository root:
+
+    python -m benchmarks.rate_limiter_memory --emails 1000000
+    python -m benchmarks.rate_limiter_memory --backend sqlite --emails 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from backend.rate_limiter import MemoryRateLimitStore, RateLimiter, SQLiteRateLimitStore
+
+
+def run(backend: str, emails: int, max_entries: int, checkpoints: int = 5) -> None:
+    if backend == "sqlite":
+        path = os.path.join(tempfile.mkdtemp(), "rate_limits.db")
+        store = SQLiteRateLimitStore(path)
+    else:
+        store = MemoryRateLimitStore(max_entries=max_entries)
+    limiter = RateLimiter(store)
+
+    tracemalloc.start()
+    step = max(emails // checkpoints, 1)
+    started = time.perf_counter()
+    print(f"{'emails':>10} {'tracked keys':>13} {'python heap MiB':>16} {'attempts/s':>11}")
+    for i in range(1, emails + 1):
+        email = f"user{i}@example.com"
+        limiter.check_rate_limit(email)
+        limiter.add_attempt(email)
+        if i % step == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            rate = i / (time.perf_counter() - started)
+            print(f"{i:>10} {len(store):>13} {current / 2 ** 20:>16.1f} {rate:>11.0f}")
+    tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--emails", type=int, default=1_000_000)
+    parser.add_argument("--max-entries", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.backend, args.emails, args.max_entries)
+
+
+if __name__ == "__main__":
+    main()
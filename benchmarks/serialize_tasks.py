@@ -0,0 +1,81 @@
+"""Cost of turning a page of loaded tasks into a JSON response body.
+
+Compares validating the rows into the response model (what FastAPI does for `response_model`)
+followed by the stdlib encoder or pydantic's own JSON dump, with the direct dict + orjson path
+of backend.serializers.
+
+    python -m benchmarks.serialize_tasks --tasks 10000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+
+from backend import models, schemas
+from backend.serializers import ORJSONResponse, tasks_to_list
+
+task_list = TypeAdapter(List[schemas.TaskResponse])
+
+
+def make_tasks(count: int) -> List[models.Task]:
+    now = datetime.now()
+    tasks = []
+    for index in range(count):
+        task = models.Task(
+            id=index, title=f"Task {index}", description="Description " * 8, status=index % 3,
+            created_at=now, updated_at=now, due_date=now + timedelta(days=index % 30), priority=1 + index % 4,
+            user_id=1, created_by_id=2
+        )
+        # Every fifth task has an attachment
+        task.files = [models.TaskFile(
+            id=index, filename="spec.pdf", content_type="application/pdf", size=1024, created_at=now, task_id=index
+        )] if index % 5 == 0 else []
+        tasks.append(task)
+    return tasks
+
+
+def validate_and_json_dumps(tasks) -> bytes:
+    validated = task_list.validate_python(tasks, from_attributes=True)
+    return json.dumps(task_list.dump_python(validated, mode="json")).encode()
+
+
+def validate_and_dump_json(tasks) -> bytes:
+    return task_list.dump_json(task_list.validate_python(tasks, from_attributes=True))
+
+
+def direct_orjson(tasks) -> bytes:
+    return ORJSONResponse(tasks_to_list(tasks)).body
+
+
+def measure(serialize, tasks, repeat: int) -> float:
+    serialize(tasks)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        serialize(tasks)
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    assert json.loads(direct_orjson(tasks)) == json.loads(validate_and_dump_json(tasks))
+    baseline = None
+    for name, serialize in [
+        ("response model + json.dumps", validate_and_json_dumps),
+        ("response model + dump_json", validate_and_dump_json),
+        ("serializers + orjson", direct_orjson),
+    ]:
+        elapsed = measure(serialize, tasks, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:28} {elapsed * 1000:8.1f} ms  {baseline / elapsed:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
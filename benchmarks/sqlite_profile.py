@@ -0,0 +1,97 @@
+"""Concurrent read/write throughput of the SQLite engine profiles.
+
+Reader threads page through one user's tasks while writer threads insert tasks, against a
+fresh database file per profile. Run from the repository root:
+
+    python -m benchmarks.sqlite_profile --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import desc, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.database import build_engine, SQLITE_PROFILES
+
+
+def seed(engine, users: int, tasks_per_user: int) -> None:
+    models.Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add_all(models.User(email=f"user{i}@example.com", password_hash="x", secret_word="x") for i in range(users))
+        db.flush()
+        db.add_all(
+            models.Task(title=f"Task {j}", description="", user_id=i + 1, created_by_id=i + 1)
+            for i in range(users) for j in range(tasks_per_user)
+        )
+        db.commit()
+
+
+def run(profile: str, readers: int, writers: int, seconds: float, users: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = build_engine(f"sqlite:///{path}", profile=profile, pool_size=readers + writers)
+    seed(engine, users, 50)
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def count(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def reader(n: int) -> None:
+        user_id = n % users + 1
+        query = select(models.Task).where(models.Task.user_id == user_id).order_by(
+            desc(models.Task.created_at), desc(models.Task.id)
+        ).limit(20)
+        while not stop.is_set():
+            try:
+                with Session(engine) as db:
+                    db.scalars(query).all()
+                count("reads")
+            except OperationalError:
+                count("errors")
+
+    def writer(n: int) -> None:
+        while not stop.is_set():
+            try:
+                with Session(engine) as db:
+                    db.add(models.Task(title="New task", description="", user_id=n % users + 1, created_by_id=1))
+                    db.commit()
+                count("writes")
+            except OperationalError:
+                count("errors")
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return {key: value / seconds for key, value in counts.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'reads/s':>12}{'writes/s':>12}{'errors/s':>12}")
+    for profile in SQLITE_PROFILES:
+        result = run(profile, args.readers, args.writers, args.seconds, args.users)
+        print(f"{profile:<12}{result['reads']:>12.0f}{result['writes']:>12.0f}{result['errors']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Full-text task search through tasks_fts versus a LIKE scan over titles and descriptions.
+
+Builds a throwaway database with --tasks generated tasks (one million by default) spread over
+--users users, then times the same searches both ways. Run from the repository root:
+
+    python -m benchmarks.task_search --tasks 1000000 --queries 200
+"""
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+from backend import crud, models
+from backend.database import build_engine
+from backend.search import build_match_query
+
+# Synthetic vocabulary with a Zipf-like frequency distribution, like real task text
+VOCABULARY = [f"w{i:05d}" for i in range(20_000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def seed(db: Session, tasks: int, users: int, batch: int = 50_000) -> None:
+    rng = random.Random(42)
+    db.execute(insert(models.User), [
+        {"email": f"user{i}@example.com", "password_hash": "x", "secret_word": "x"} for i in range(users)
+    ])
+    for start in range(0, tasks, batch):
+        db.execute(insert(models.Task), [
+            {
+                "title": " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=4)),
+                "description": " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=20)),
+                "user_id": rng.randint(1, users),
+                "created_by_id": 1,
+            }
+            for _ in range(min(batch, tasks - start))
+        ])
+        db.commit()
+
+
+def like_search(db: Session, term: str, user_id: int, limit: int = 20):
+    pattern = f"%{term}%"
+    return db.scalars(select(models.Task).where(
+        or_(models.Task.title.like(pattern), models.Task.description.like(pattern)),
+        crud.visible_task_filter(user_id)
+    ).limit(limit)).all()
+
+
+def timed(fn, queries) -> float:
+    started = time.perf_counter()
+    for args in queries:
+        fn(*args)
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = build_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    models.Base.metadata.create_all(bind=engine)
+    db = Session(engine)
+    started = time.perf_counter()
+    seed(db, args.tasks, args.users)
+    print(f"seeded {args.tasks} tasks in {time.perf_counter() - started:.1f} s")
+
+    rng = random.Random(7)
+    # Terms from the middle of the distribution: neither stop words nor hapaxes
+    queries = [(rng.choice(VOCABULARY[100:2000]), rng.randint(1, args.users)) for _ in range(args.queries)]
+    fts = timed(lambda term, user_id: crud.search_tasks(db, build_match_query(term), user_id), queries)
+    like = timed(lambda term, user_id: like_search(db, term, user_id), queries)
+    print(f"FTS5 MATCH + bm25: {fts * 1000:9.2f} ms/query")
+    print(f"LIKE scan:         {like * 1000:9.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
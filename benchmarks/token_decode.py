@@ -0,0 +1,39 @@
+"""Per-request bearer token verification cost with and without the verified-token cache.
+
+Run from the repository root (SECRET_KEY and ALGORITHM must be set, e.g. via .env):
+
+    python -m benchmarks.token_decode --requests 20000
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from backend import auth
+from backend.cache import token_cache
+
+
+def measure(requests: int, cached: bool, token: str) -> float:
+    token_cache.clear()
+    started = time.perf_counter()
+    for _ in range(requests):
+        if not cached:
+            token_cache.clear()
+        auth.decode_access_token(token)
+    return (time.perf_counter() - started) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token(data={"sub": "bench@example.com"}, expires_delta=timedelta(hours=1))
+    uncached = measure(args.requests, cached=False, token=token)
+    cached = measure(args.requests, cached=True, token=token)
+    print(f"full verification: {uncached * 1e6:8.1f} us/request")
+    print(f"cached claims:     {cached * 1e6:8.1f} us/request")
+    print(f"speedup:           {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     async function checkAdminAccess() {
         try {
-            const response = await fetch('/users/me/', {
+            const response = await fetch('/users/me/summary', {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
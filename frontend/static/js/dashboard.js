@@ -43,65 +43,65 @@ document.addEventListener('DOMContentLoaded', async () => {
         notificationTracker.clearOldNotifications();
     }, 60 * 60 * 1000);
 
+    // Last body, ETag and next-page cursor per URL; the server answers 304 while none of our tasks changed
+    const responseCache = new Map();
+    let renderedTasksKey = null;
+
+    async function fetchCached(url) {
+        const cached = responseCache.get(url);
+        const headers = {
+            'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+        };
+        if (cached) {
+            headers['If-None-Match'] = cached.etag;
+        }
+
+        const response = await fetch(url, { headers });
+        if (response.status === 304 && cached) {
+            return { ...cached, changed: false };
+        }
+        if (!response.ok) {
+            const error = new Error(`Failed to fetch ${url}`);
+            error.status = response.status;
+            throw error;
+        }
+
+        const entry = {
+            data: await response.json(),
+            etag: response.headers.get('ETag'),
+            nextCursor: response.headers.get('X-Next-Cursor')
+        };
+        if (entry.etag) {
+            responseCache.set(url, entry);
+        }
+        return { ...entry, changed: true };
+    }
+
     async function loadUserProfile() {
         try {
-            const response = await fetch('/users/me/', {
-                headers: {
-                    'Authorization': `Bearer ${token}`
-                }
-            });
-
-            if (response.ok) {
-                const userData = await response.json();
-                adminMenuItem.style.display = userData.role === 'admin' ? 'block' : 'none';
-            } else if (response.status === 401) {
+            const { data: userData } = await fetchCached('/users/me/summary');
+            adminMenuItem.style.display = userData.role === 'admin' ? 'block' : 'none';
+        } catch (error) {
+            console.error('Error loading profile:', error);
+            if (error.status === 401) {
                 localStorage.removeItem('access_token');
                 window.location.href = '/';
             }
-        } catch (error) {
-            console.error('Error loading profile:', error);
         }
     }
 
     async function loadTasks() {
         try {
-            const userResponse = await fetch('/users/me/', {
-                headers: {
-                    'Authorization': `Bearer ${token}`
-                }
-            });
-
-            if (!userResponse.ok) {
-                throw new Error('Failed to fetch user data');
-            }
-
-            const userData = await userResponse.json();
-            let tasks = [];
-
-            if (userData.role === 'pm') {
-                const assignedResponse = await fetch('/assigned-tasks/', {
-                    headers: {
-                        'Authorization': `Bearer ${token}`
-                    }
-                });
-
-                if (assignedResponse.ok) {
-                    const assignedTasks = await assignedResponse.json();
-                    tasks = assignedTasks;
-                }
-            } else {
-                const response = await fetch('/tasks/', {
-                    headers: {
-                        'Authorization': `Bearer ${token}`
-                    }
-                });
-
-                if (response.ok) {
-                    tasks = await response.json();
-                }
+            const { data: userData } = await fetchCached('/users/me/summary');
+            const url = userData.role === 'pm' ? '/assigned-tasks/' : '/tasks/';
+            const params = taskQueryParams();
+            const tasksKey = `${url}?${params}`;
+            const { tasks, changed } = await fetchAllTasks(url, params);
+
+            if (changed || tasksKey !== renderedTasksKey) {
+                renderTasks(tasks);
+                renderedTasksKey = tasksKey;
             }
-
-            renderTasks(tasks);
             checkDeadlines(tasks);
 
         } catch (error) {
@@ -113,6 +113,52 @@ document.addEventListener('DOMContentLoaded', async () => {
         }
     }
 
+    const PAGE_SIZE = 100;
+
+    // Server-side sort keys of the sort menu; "priority asc" lists the least urgent (highest number) first
+    const SORT_PARAMS = {
+        'priority:asc': '-priority',
+        'priority:desc': 'priority',
+        'due_date:asc': 'due_date',
+        'due_date:desc': '-due_date'
+    };
+
+    function taskQueryParams() {
+        const params = new URLSearchParams();
+        const sort = SORT_PARAMS[`${currentSort.field}:${currentSort.order}`];
+        if (sort) {
+            params.set('sort', sort);
+        }
+        if (currentFilter.type === 'priority' && currentFilter.value) {
+            params.set('priority_min', currentFilter.value);
+            params.set('priority_max', currentFilter.value);
+        }
+        if (currentFilter.type === 'status' && currentFilter.value) {
+            const statuses = currentFilter.value === 'completed' ? [2] : [0, 1];
+            statuses.forEach(value => params.append('status', value));
+        }
+        return params;
+    }
+
+    async function fetchAllTasks(url, params) {
+        // The default sort pages with X-Next-Cursor, the others with skip
+        const tasks = [];
+        let changed = false;
+        params.set('limit', PAGE_SIZE);
+        while (true) {
+            const page = await fetchCached(`${url}?${params}`);
+            tasks.push(...page.data);
+            changed = changed || page.changed;
+            if (page.nextCursor) {
+                params.set('cursor', page.nextCursor);
+            } else if (!params.has('sort') || page.data.length < PAGE_SIZE) {
+                return { tasks, changed };
+            } else {
+                params.set('skip', tasks.length);
+            }
+        }
+    }
+
     function calculateFuseProgress(DueDate, StartDate) {
         const now = new Date();
         const startDateObj = new Date(StartDate);
@@ -168,6 +214,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     const sortBtn = document.getElementById('sortBtn');
     const sortMenu = document.querySelector('.sort-menu');
     let currentSort = { field: null, order: null };
+    let currentFilter = { type: null, value: null };
 
     sortBtn.addEventListener('click', (e) => {
         e.stopPropagation();
@@ -214,35 +261,24 @@ document.addEventListener('DOMContentLoaded', async () => {
             kanbanBoard.appendChild(column);
         });
 
-        if (currentSort.field) {
-            tasks.sort((a, b) => {
-                let comparison = 0;
-                if (currentSort.field === 'priority') {
-                    comparison = b.priority - a.priority;
-                } else if (currentSort.field === 'due_date') {
-                    const dateA = a.due_date ? new Date(a.due_date) : new Date(8640000000000000);
-                    const dateB = b.due_date ? new Date(b.due_date) : new Date(8640000000000000);
-                    comparison = dateA - dateB;
-                }
-                return currentSort.order === 'desc' ? -comparison : comparison;
-            });
-        }
-
         tasks.forEach(task => {
-            const taskElement = createTaskCard(task);
-            taskElement.draggable = true;
-
-            taskElement.addEventListener('dragstart', handleDragStart);
-            taskElement.addEventListener('dragend', handleDragEnd);
-
             const status = task.status || 0;
             const columnKey = status === 0 ? 'backlog' : status === 1 ? 'inProgress' : 'completed';
-            columns[columnKey].querySelector('.kanban-tasks').appendChild(taskElement);
+            columns[columnKey].querySelector('.kanban-tasks').appendChild(createDraggableTaskCard(task));
         });
 
         tasksList.appendChild(kanbanBoard);
     }
 
+    function createDraggableTaskCard(task) {
+        const taskElement = createTaskCard(task);
+        taskElement.draggable = true;
+
+        taskElement.addEventListener('dragstart', handleDragStart);
+        taskElement.addEventListener('dragend', handleDragEnd);
+        return taskElement;
+    }
+
     function createKanbanColumn(title, status) {
         const column = document.createElement('div');
         column.className = 'kanban-column';
@@ -468,7 +504,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
         if (userRole === 'pm') {
             try {
-                const response = await fetch('/users/me/', {
+                const response = await fetch('/users/me/summary', {
                     headers: {
                         'Authorization': `Bearer ${token}`
                     }
@@ -669,7 +705,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     async function checkUserRole() {
         try {
-            const response = await fetch('/users/me/', {
+            const response = await fetch('/users/me/summary', {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
@@ -804,10 +840,115 @@ document.addEventListener('DOMContentLoaded', async () => {
         });
     }
 
-    setInterval(async () => {
-        await loadUserProfile();
-        await loadTasks();
-    }, 30000);
+    // Task changes are pushed over Server-Sent Events; polling only runs while the stream is down
+    const POLL_INTERVAL = 30000;
+    const EVENT_RECONNECT_DELAY = 5000;
+    let pollTimer = null;
+    let reloadTimer = null;
+
+    function startPolling() {
+        if (pollTimer === null) {
+            pollTimer = setInterval(async () => {
+                await loadUserProfile();
+                await loadTasks();
+            }, POLL_INTERVAL);
+        }
+    }
+
+    function stopPolling() {
+        clearInterval(pollTimer);
+        pollTimer = null;
+    }
+
+    function scheduleReload() {
+        // Bursts of events end up as one conditional list request
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(loadTasks, 300);
+    }
+
+    function patchTaskCard(task) {
+        // Only the default newest-first view without server-side filters keeps its order when a task changes
+        const card = document.querySelector(`.task-item[data-task-id="${task.id}"]`);
+        if (!card || currentSort.field || (currentFilter.type !== 'name' && currentFilter.value)) {
+            return false;
+        }
+        const column = document.querySelector(`.kanban-column[data-status="${task.status || 0}"] .kanban-tasks`);
+        if (!column) {
+            return false;
+        }
+
+        const newCard = createDraggableTaskCard(task);
+        card.remove();
+        const next = [...column.children].find(element => Number(element.dataset.taskId) < task.id);
+        column.insertBefore(newCard, next || null);
+        applyFilters();
+        return true;
+    }
+
+    function handleTaskEvent(event) {
+        const data = JSON.parse(event.data);
+        if (event.type === 'task_deleted') {
+            const card = document.querySelector(`.task-item[data-task-id="${data.task_id}"]`);
+            if (card) {
+                card.remove();
+            }
+        } else if (event.type === 'file_added' || event.type === 'file_deleted') {
+            if (currentTaskId !== null && Number(currentTaskId) === data.task_id) {
+                loadTaskFiles(data.task_id);
+            }
+        } else if (!(event.type === 'task_updated' && patchTaskCard(data.task))) {
+            scheduleReload();
+        }
+    }
+
+    async function fetchEventTicket() {
+        const response = await fetch('/events/ticket', {
+            method: 'POST',
+            headers: {
+                'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+            }
+        });
+        if (!response.ok) {
+            throw new Error(`Event ticket request failed: ${response.status}`);
+        }
+        return (await response.json()).ticket;
+    }
+
+    async function connectEvents() {
+        if (!window.EventSource) {
+            startPolling();
+            return;
+        }
+
+        // The URL carries a short-lived stream ticket, never the access token
+        let ticket;
+        try {
+            ticket = await fetchEventTicket();
+        } catch (error) {
+            console.error('Error opening event stream:', error);
+            startPolling();
+            setTimeout(connectEvents, POLL_INTERVAL);
+            return;
+        }
+
+        const source = new EventSource(`/events?ticket=${encodeURIComponent(ticket)}`);
+        ['task_created', 'task_updated', 'task_reassigned', 'task_deleted', 'tasks_changed', 'file_added', 'file_deleted']
+            .forEach(type => source.addEventListener(type, handleTaskEvent));
+        source.addEventListener('open', () => {
+            stopPolling();
+            // Catch up on whatever happened while the stream was down
+            scheduleReload();
+        });
+        source.addEventListener('error', () => {
+            startPolling();
+            if (source.readyState === EventSource.CLOSED) {
+                // The browser gave up, typically because its reconnect reused an expired ticket; get a new one
+                setTimeout(connectEvents, EVENT_RECONNECT_DELAY);
+            }
+        });
+    }
+
+    connectEvents();
 
     function updateFuse(taskElement, dueDate) {
         const fuseElement = taskElement.querySelector('.fuse');
@@ -871,8 +1012,6 @@ document.addEventListener('DOMContentLoaded', async () => {
         });
     }
 
-    let currentFilter = { type: null, value: null };
-
     filterBtn.addEventListener('click', (e) => {
         e.stopPropagation();
         filterMenu.classList.toggle('active');
@@ -896,12 +1035,12 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     document.querySelector('#priorityFilter select').addEventListener('change', (e) => {
         currentFilter = { type: 'priority', value: e.target.value };
-        applyFilters();
+        loadTasks();
     });
 
     document.querySelector('#statusFilter select').addEventListener('change', (e) => {
         currentFilter = { type: 'status', value: e.target.value };
-        applyFilters();
+        loadTasks();
     });
 
     function applyFilters() {
@@ -916,17 +1055,6 @@ document.addEventListener('DOMContentLoaded', async () => {
                 show = regex.test(title);
             }
 
-            if (currentFilter.type === 'priority' && currentFilter.value) {
-                const priority = task.querySelector('[class^="priority-"]').className.match(/priority-(\d)/)[1];
-                show = priority === currentFilter.value;
-            }
-
-            if (currentFilter.type === 'status' && currentFilter.value) {
-                const isCompleted = task.classList.contains('completed');
-                show = (currentFilter.value === 'completed' && isCompleted) ||
-                       (currentFilter.value === 'active' && !isCompleted);
-            }
-
             task.style.display = show ? 'block' : 'none';
         });
     }
@@ -955,17 +1083,7 @@ document.addEventListener('DOMContentLoaded', async () => {
             const type = option.dataset.type;
 
             try {
-                const response = await fetch('/tasks/', {
-                    headers: {
-                        'Authorization': `Bearer ${localStorage.getItem('access_token')}`
-                    }
-                });
-
-                if (!response.ok) {
-                    throw new Error('Ошибка получения задач');
-                }
-
-                const tasks = await response.json();
+                const { tasks } = await fetchAllTasks('/tasks/', taskQueryParams());
 
                 if (tasks.length === 0) {
                     showNotification('Нет задач для экспорта', 'warning');
@@ -977,7 +1095,7 @@ document.addEventListener('DOMContentLoaded', async () => {
                     'Описание': task.description || '',
                     'Приоритет': getPriorityLabel(task.priority),
                     'Срок': task.due_date ? new Date(task.due_date).toLocaleString('ru-RU') : '',
-                    'Статус': task.completed ? 'Завершена' : 'В процессе'
+                    'Статус': task.status === 2 ? 'Завершена' : 'В процессе'
                 }));
 
                 if (type === 'excel') {
@@ -14,7 +14,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     async function loadUserProfile() {
         try {
-            const response = await fetch('/users/me/', {
+            const response = await fetch('/users/me/summary', {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
@@ -1,28 +1,44 @@
 from datetime import timedelta
-from typing import Annotated, List
-from urllib.parse import quote
+from typing import Annotated, List, Optional
 
-from fastapi import FastAPI, Depends, HTTPException, status, Body, UploadFile
+from fastapi import FastAPI, Depends, HTTPException, status, Body, Query, UploadFile, Request
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from jose import JWTError
+from pydantic import ValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
 import backend.models as models
 import backend.schemas as schemas
 import backend.crud as crud
 import backend.auth as auth
-from backend.config import ACCESS_TOKEN_EXPIRE_MINUTES
-from backend.utils import create_admin_user, get_db, sanitize_filename, validate_file_type, validate_file_size
+from backend.config import ACCESS_TOKEN_EXPIRE_MINUTES, ATTACHMENT_CHUNK_SIZE, EVENT_TICKET_SECONDS
+from backend.utils import (
+    create_admin_user, get_async_db, get_async_read_db, get_db, sanitize_filename, validate_file_type, MAX_FILE_SIZE
+)
 from backend.database import engine
-from backend.logger import setup_logger
-from backend.rate_limiter import RateLimiter
+from backend.migrations import upgrade_schema
+from backend.storage import storage, BlobMissingError, FileTooLargeError
+from backend.downloads import build_file_response
+from backend.pagination import Cursor, decode_cursor, next_cursor
+from backend.search import build_match_query, highlight_snippet
+from backend.logger import SAMPLED, setup_logger
+from backend.rate_limiter import rate_limiter
+from backend.cache import principal_cache, token_cache
+from backend.metrics import REGISTRY, MetricsMiddleware
+from backend.events import event_hub
+from backend.serializers import (
+    TASK_RESPONSE_FIELDS, TASK_SUMMARY_FIELDS, ORJSONResponse, tasks_to_list, user_to_dict
+)
 
 logger = setup_logger(__name__)
 
 models.Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 create_admin_user()
 
 app = FastAPI(
@@ -39,21 +55,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
 
+
+@app.exception_handler(auth.PasswordPoolBusy)
+async def password_pool_busy_handler(request: Request, exc: auth.PasswordPoolBusy):
+    logger.warning("Rejected %s %s: password pool is saturated", request.method, request.url.path)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Сервер перегружен, попробуйте позже"},
+        headers={"Retry-After": "1"}
+    )
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
+read_db_dependency = Annotated[AsyncSession, Depends(get_async_read_db)]
 token_dependency = Annotated[str, Depends(oauth2_scheme)]
 refresh_token_body = Body(...)
 password_body = Body(...)
 
-rate_limiter = RateLimiter()
-
 
-def get_current_user(db: db_dependency, token: token_dependency):
+async def authenticate_token(db: AsyncSession, token: str, token_type: str = "access") -> schemas.Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -61,65 +89,190 @@ def get_current_user(db: db_dependency, token: token_dependency):
     )
     try:
         payload = auth.decode_access_token(token)
-        email: str = payload.get("sub")
-        if email is None:
+        email: str = payload.get("sub") if payload else None
+        # Refresh tokens and event tickets are not accepted where an access token is expected, and vice versa
+        if email is None or payload.get("type", "access") != token_type:
             raise credentials_exception
         token_data = schemas.TokenData(email=email)
     except JWTError:
         logger.warning("JWTError: Invalid token")
         raise credentials_exception
-    user = crud.get_user_by_email(db, email=token_data.email)
-    if user is None:
-        logger.warning(f"User not found: {token_data.email}")
-        raise credentials_exception
-    logger.info(f"User authenticated: {user.email}")
-    return user
+    principal = principal_cache.get(token_data.email)
+    if principal is None:
+        user = await crud.get_user_by_email_async(db, email=token_data.email)
+        if user is None:
+            logger.warning("User not found: %s", token_data.email)
+            raise credentials_exception
+        principal = schemas.Principal.model_validate(user)
+        principal_cache.set(token_data.email, principal)
+    logger.info("User authenticated: %s", principal.email, extra=SAMPLED)
+    return principal
 
 
-current_user_dependency = Annotated[schemas.User, Depends(get_current_user)]
+async def get_current_user(db: read_db_dependency, token: token_dependency):
+    return await authenticate_token(db, token)
+
+
+current_user_dependency = Annotated[schemas.Principal, Depends(get_current_user)]
 form_data_dependency = Annotated[OAuth2PasswordRequestForm, Depends()]
 
 
+def get_cursor(cursor: Optional[str] = None) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        logger.warning("Invalid pagination cursor: %s", cursor)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+cursor_dependency = Annotated[Optional[Cursor], Depends(get_cursor)]
+
+
+def get_task_filters(filters: Annotated[schemas.TaskFilters, Query()]) -> schemas.TaskFilters:
+    return filters
+
+
+task_filters_dependency = Annotated[schemas.TaskFilters, Depends(get_task_filters)]
+
+
+def get_task_fields(
+    fields: Annotated[Optional[str], Query(description="Comma-separated TaskResponse fields, e.g. title,files")] = None,
+    view: schemas.TaskView = schemas.TaskView.FULL
+) -> Optional[tuple[str, ...]]:
+    """Fields of the tasks to return; None for complete TaskResponse objects."""
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(TASK_RESPONSE_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown task fields: {', '.join(sorted(unknown))}"
+            )
+        # Tasks are always identified by their id
+        return tuple(name for name in TASK_RESPONSE_FIELDS if name in requested or name == "id")
+    if view == schemas.TaskView.SUMMARY:
+        return TASK_SUMMARY_FIELDS
+    return None
+
+
+task_fields_dependency = Annotated[Optional[tuple[str, ...]], Depends(get_task_fields)]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of `etag` against an If-None-Match header value."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+async def check_collection_version(
+    request: Request,
+    response: Response,
+    db: read_db_dependency,
+    current_user: current_user_dependency
+) -> None:
+    """Answer 304 when none of the user's tasks changed since the ETag the client holds."""
+    version = await crud.get_collection_version_async(db, current_user.id)
+    etag = f'W/"{current_user.id}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+async def check_task_list_version(
+    request: Request,
+    response: Response,
+    db: read_db_dependency,
+    current_user: current_user_dependency,
+    filters: task_filters_dependency
+) -> None:
+    # Which tasks are overdue changes with the clock, not only with writes
+    if not filters.overdue:
+        await check_collection_version(request, response, db, current_user)
+
+
+conditional_get = Depends(check_collection_version)
+conditional_task_list_get = Depends(check_task_list_version)
+
+
+def check_cursor_sort(cursor: Optional[Cursor], filters: schemas.TaskFilters) -> None:
+    if cursor is not None and filters.sort != schemas.TaskSort.CREATED_DESC:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is only supported with the default sort; use skip instead"
+        )
+
+
+def paginate(response: Response, items: list, limit: int, keyset: bool = True) -> list:
+    cursor = next_cursor(items, limit) if keyset else None
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
+    return items[:limit]
+
+
+def json_response(content, response: Response) -> ORJSONResponse:
+    """Encode already trusted `content` directly, keeping the headers dependencies set on `response`."""
+    fast_response = ORJSONResponse(content)
+    fast_response.headers.raw.extend(response.headers.raw)
+    return fast_response
+
+
+def publish_task_event(event: str, task: models.Task, *user_ids: int, deleted: bool = False) -> None:
+    """Tell the assignee, the creator and `user_ids` about a change of `task`."""
+    data = {"task_id": task.id, "task": None}
+    if not deleted:
+        data["task"] = schemas.TaskResponse.model_validate(task).model_dump(mode="json")
+    event_hub.publish(event, (task.user_id, task.created_by_id, *user_ids), data)
+
+
 @app.post("/users/", response_model=schemas.User)
 def create_user(user: schemas.UserCreate, db: db_dependency):
-    logger.info(f"Creating user with email: {user.email}")
+    logger.info("Creating user with email: %s", user.email)
     db_user = crud.get_user_by_email(db, email=user.email)
     if db_user:
-        logger.warning(f"Email already registered: {user.email}")
+        logger.warning("Email already registered: %s", user.email)
         raise HTTPException(status_code=400, detail="Email already registered")
     new_user = crud.create_user(db=db, user=user)
-    logger.info(f"User created: {new_user.email}")
+    logger.info("User created: %s", new_user.email)
     return new_user
 
 
-@app.get("/users/me/", response_model=schemas.User)
-def read_users_me(current_user: current_user_dependency):
-    logger.info(f"Current user: {current_user.email}, role: {current_user.role}")
-    return {
-        "email": current_user.email,
-        "id": current_user.id,
-        "created_at": current_user.created_at,
-        "role": current_user.role,
-        "is_active": current_user.is_active,
-        "tasks": current_user.tasks,
-        "created_tasks": current_user.created_tasks
-    }
+@app.get("/users/me/", response_model=schemas.UserWithTaskProjections, dependencies=[conditional_get])
+async def read_users_me(
+    db: read_db_dependency, current_user: current_user_dependency, response: Response, fields: task_fields_dependency
+):
+    logger.info("Current user: %s, role: %s", current_user.email, current_user.role, extra=SAMPLED)
+    user = await crud.get_user_with_tasks_async(db, current_user.id, fields)
+    content = user_to_dict(user)
+    content["tasks"] = tasks_to_list(user.tasks, fields or TASK_RESPONSE_FIELDS)
+    content["created_tasks"] = tasks_to_list(user.created_tasks, fields or TASK_RESPONSE_FIELDS)
+    return json_response(content, response)
+
+
+@app.get("/users/me/summary", response_model=schemas.UserSummary, dependencies=[conditional_get])
+async def read_users_me_summary(db: read_db_dependency, current_user: current_user_dependency):
+    logger.info("Current user summary: %s", current_user.email, extra=SAMPLED)
+    return await crud.get_user_summary_async(db, current_user.id)
 
 
 @app.post("/token", response_model=schemas.Token)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: db_dependency
+    db: async_db_dependency
 ):
-    logger.info(f"Logging in user: {form_data.username}")
+    logger.info("Logging in user: %s", form_data.username)
 
     try:
         rate_limiter.check_rate_limit(form_data.username)
 
-        user = auth.authenticate_user(db, form_data.username, form_data.password)
+        user = await auth.authenticate_user_async(db, form_data.username, form_data.password)
         if not user:
             rate_limiter.add_attempt(form_data.username)
-            logger.warning(f"Failed login attempt for user: {form_data.username}")
+            logger.warning("Failed login attempt for user: %s", form_data.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Неверный email или пароль",
@@ -136,17 +289,17 @@ async def login_for_access_token(
             data={"sub": user.email}
         )
 
-        logger.info(f"Tokens generated for user: {form_data.username}")
+        logger.info("Tokens generated for user: %s", form_data.username)
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
             "token_type": "bearer"
         }
 
-    except HTTPException as e:
+    except (HTTPException, auth.PasswordPoolBusy) as e:
         raise e
     except Exception as e:
-        logger.error(f"Error during login: {e}")
+        logger.error("Error during login: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Внутренняя ошибка сервера"
@@ -176,44 +329,46 @@ async def refresh_token(refresh_token: str = refresh_token_body):
 def read_users(
     db: db_dependency,
     current_user: current_user_dependency,
+    response: Response,
+    cursor: cursor_dependency,
     skip: int = 0,
     limit: int = 10
 ):
-    logger.info(f"Reading users: skip={skip}, limit={limit}")
-    users = crud.get_users(db, skip=skip, limit=limit)
-    logger.info(f"Found {len(users)} users")
+    logger.info("Reading users: skip=%s, limit=%s", skip, limit)
+    users = paginate(response, crud.get_users(db, skip=skip, limit=limit + 1, cursor=cursor), limit)
+    logger.info("Found %s users", len(users))
     return users
 
 
 @app.get("/users/{user_id}", response_model=schemas.User)
 def read_user(user_id: int, db: db_dependency):
-    logger.info(f"Reading user: {user_id}")
+    logger.info("Reading user: %s", user_id)
     db_user = crud.get_user(db, user_id=user_id)
     if db_user is None:
-        logger.warning(f"User not found: {user_id}")
+        logger.warning("User not found: %s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 
 @app.put("/users/{user_id}", response_model=schemas.User)
 def update_user(user_id: int, user_update: schemas.UserUpdate, db: db_dependency):
-    logger.info(f"Updating user: {user_id}")
+    logger.info("Updating user: %s", user_id)
     db_user = crud.update_user(db, user_id=user_id, user_update=user_update)
     if db_user is None:
-        logger.warning(f"User not found: {user_id}")
+        logger.warning("User not found: %s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
-    logger.info(f"User updated: {db_user.email}")
+    logger.info("User updated: %s", db_user.email)
     return db_user
 
 
 @app.delete("/users/{user_id}", response_model=schemas.User)
 def delete_user(user_id: int, db: db_dependency):
-    logger.info(f"Deleting user: {user_id}")
+    logger.info("Deleting user: %s", user_id)
     db_user = crud.delete_user(db, user_id=user_id)
     if db_user is None:
-        logger.warning(f"User not found: {user_id}")
+        logger.warning("User not found: %s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
-    logger.info(f"User deleted: {db_user.email}")
+    logger.info("User deleted: %s", db_user.email)
     return db_user
 
 
@@ -223,7 +378,7 @@ def create_task(
     db: db_dependency,
     current_user: current_user_dependency
 ):
-    logger.info(f"Creating task: {task.title} for user: {current_user.email}")
+    logger.info("Creating task: %s for user: %s", task.title, current_user.email)
 
     if current_user.role == 'pm' and task.user_id:
         created_task = crud.create_task(
@@ -241,24 +396,170 @@ def create_task(
             created_by_id=current_user.id
         )
 
-    logger.info(f"Task created successfully: {task.title} with priority {task.priority}")
+    logger.info("Task created successfully: %s with priority %s", task.title, task.priority)
+    publish_task_event("task_created", created_task)
     return created_task
 
 
-@app.get("/tasks/", response_model=List[schemas.TaskResponse])
-def read_tasks(db: db_dependency, current_user: current_user_dependency):
-    logger.info(f"Reading tasks for user: {current_user.email}")
-    tasks = crud.get_user_tasks(db, user_id=current_user.id)
-    logger.info(f"Found {len(tasks)} tasks for user: {current_user.email}")
-    return tasks
+@app.post("/tasks/bulk", response_model=schemas.TaskBulkCreateResponse)
+def create_tasks_bulk(
+    bulk: schemas.TaskBulkCreate,
+    db: db_dependency,
+    current_user: current_user_dependency
+):
+    logger.info("Bulk creating %s tasks for user: %s", len(bulk.tasks), current_user.email)
+    errors = []
+    tasks = []
+    for index, item in enumerate(bulk.tasks):
+        try:
+            tasks.append((index, schemas.TaskCreate.model_validate(item)))
+        except ValidationError as e:
+            errors.append(schemas.TaskBulkError(index=index, detail="; ".join(err["msg"] for err in e.errors())))
+
+    can_assign = current_user.role == 'pm'
+    assignees = crud.get_existing_user_ids(db, {task.user_id for _, task in tasks if can_assign and task.user_id})
+    rows = []
+    for index, task in tasks:
+        user_id = task.user_id if can_assign and task.user_id else current_user.id
+        if user_id != current_user.id and user_id not in assignees:
+            errors.append(schemas.TaskBulkError(index=index, detail=f"User {user_id} not found"))
+            continue
+        rows.append(crud.task_values(task, user_id, current_user.id))
+
+    errors.sort(key=lambda error: error.index)
+    if errors and bulk.atomic:
+        logger.warning("Bulk create rejected for user %s: %s invalid tasks", current_user.email, len(errors))
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=[error.model_dump() for error in errors]
+        )
 
+    ids = crud.create_tasks_bulk(db, rows)
+    logger.info("Bulk created %s tasks for user: %s", len(ids), current_user.email)
+    event_hub.publish("tasks_changed", {current_user.id, *(row["user_id"] for row in rows)}, {"task_ids": ids})
+    return {"ids": ids, "errors": errors}
 
-@app.get("/tasks/{task_id}", response_model=schemas.TaskResponse)
-def read_task(task_id: int, db: db_dependency, current_user: current_user_dependency):
-    logger.info(f"Reading task: {task_id} for user: {current_user.email}")
-    db_task = crud.get_task(db, task_id=task_id, user_id=current_user.id)
+
+@app.patch("/tasks/bulk", response_model=schemas.TaskBulkUpdateResponse)
+def update_tasks_bulk(
+    bulk: schemas.TaskBulkUpdate,
+    db: db_dependency,
+    current_user: current_user_dependency
+):
+    logger.info("Bulk updating %s tasks for user: %s", len(bulk.ids), current_user.email)
+    changes = {
+        key: value for key, value in bulk.changes.model_dump(exclude_unset=True).items()
+        if key in crud.BULK_UPDATE_TASK_FIELDS
+    }
+    if not changes:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No changes to apply")
+
+    rows = crud.update_tasks_bulk(db, bulk.ids, current_user.id, changes)
+    updated = [row.id for row in rows]
+    not_found = sorted(set(bulk.ids) - set(updated))
+    logger.info("Bulk updated %s tasks for user: %s", len(updated), current_user.email)
+    users = {user_id for row in rows for user_id in (row.user_id, row.created_by_id)}
+    event_hub.publish("tasks_changed", users, {"task_ids": updated})
+    return {"updated": updated, "not_found": not_found}
+
+
+@app.get("/tasks/", response_model=List[schemas.TaskProjection], dependencies=[conditional_task_list_get])
+async def read_tasks(
+    db: read_db_dependency,
+    current_user: current_user_dependency,
+    response: Response,
+    cursor: cursor_dependency,
+    filters: task_filters_dependency,
+    fields: task_fields_dependency,
+    skip: int = 0,
+    limit: int = 10
+):
+    logger.info("Reading tasks for user: %s", current_user.email, extra=SAMPLED)
+    check_cursor_sort(cursor, filters)
+    tasks = await crud.get_user_tasks_async(
+        db, user_id=current_user.id, skip=skip, limit=limit + 1, filters=filters, cursor=cursor,
+        fields=fields
+    )
+    tasks = paginate(response, tasks, limit, keyset=filters.sort == schemas.TaskSort.CREATED_DESC)
+    logger.info("Found %s tasks for user: %s", len(tasks), current_user.email, extra=SAMPLED)
+    return json_response(tasks_to_list(tasks, fields or TASK_RESPONSE_FIELDS), response)
+
+
+@app.get("/tasks/stats", response_model=schemas.TaskStats)
+async def read_task_stats(db: read_db_dependency, current_user: current_user_dependency):
+    logger.info("Reading task stats for user: %s", current_user.email, extra=SAMPLED)
+    stats = {"assigned": await crud.get_task_stats_async(db, "assignee", current_user.id)}
+    if current_user.role == "pm":
+        stats["created"] = await crud.get_task_stats_async(db, "creator", current_user.id)
+    return stats
+
+
+@app.get("/tasks/changes", response_model=schemas.TaskChanges, dependencies=[conditional_get])
+async def read_task_changes(
+    db: read_db_dependency,
+    current_user: current_user_dependency,
+    response: Response,
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000)
+):
+    """Задачи, изменённые после курсора since, и удалённые с тех пор задачи и файлы; since=0 — все задачи"""
+    logger.info("Reading task changes since %s for user: %s", since, current_user.email, extra=SAMPLED)
+    changes = await crud.get_task_changes_async(db, current_user.id, since, limit)
+    if changes is None:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Cursor expired, reload with since=0")
+    changes["tasks"] = tasks_to_list(changes["tasks"])
+    return json_response(changes, response)
+
+
+@app.get("/tasks/search", response_model=List[schemas.TaskSearchHit])
+async def search_tasks(
+    db: read_db_dependency,
+    current_user: current_user_dependency,
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Полнотекстовый поиск по задачам пользователя; `слово*` ищет по префиксу"""
+    try:
+        match = build_match_query(q)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Пустой поисковый запрос")
+    logger.info("User %s is searching tasks: %s", current_user.email, q)
+    rows = await crud.search_tasks_async(db, match, current_user.id, limit=limit, offset=offset)
+    return [{"task": task, "snippet": highlight_snippet(snippet), "rank": rank} for task, snippet, rank in rows]
+
+
+@app.post("/events/ticket", response_model=schemas.EventTicket)
+async def create_event_ticket(current_user: current_user_dependency):
+    """Одноцелевой билет на открытие потока событий; живёт EVENT_TICKET_SECONDS секунд"""
+    return {"ticket": auth.create_event_ticket(current_user.email), "expires_in": EVENT_TICKET_SECONDS}
+
+
+@app.get("/events")
+async def stream_events(
+    # EventSource cannot send an Authorization header, so the stream takes a ticket from POST /events/ticket
+    # rather than the access token in the URL
+    ticket: str,
+    # Function scope releases the session once the user is known instead of holding it for the whole stream
+    db: Annotated[AsyncSession, Depends(get_async_read_db, scope="function")]
+):
+    """Поток Server-Sent Events об изменениях задач пользователя"""
+    current_user = await authenticate_token(db, ticket, token_type="event_stream")
+    subscription = event_hub.subscribe(current_user.id)
+    logger.info("User %s opened an event stream", current_user.email)
+    return StreamingResponse(
+        event_hub.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/tasks/{task_id}", response_model=schemas.TaskResponse, dependencies=[conditional_get])
+async def read_task(task_id: int, db: read_db_dependency, current_user: current_user_dependency):
+    logger.info("Reading task: %s for user: %s", task_id, current_user.email, extra=SAMPLED)
+    db_task = await crud.get_task_async(db, task_id=task_id, user_id=current_user.id)
     if db_task is None:
-        logger.warning(f"Task not found: {task_id}")
+        logger.warning("Task not found: %s", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
 
@@ -270,10 +571,10 @@ def update_task(
     db: db_dependency,
     current_user: current_user_dependency
 ):
-    logger.info(f"Updating task: {task_id} for user: {current_user.email}")
+    logger.info("Updating task: %s for user: %s", task_id, current_user.email)
     db_task = crud.get_task(db, task_id=task_id, user_id=current_user.id)
     if db_task is None:
-        logger.warning(f"Task not found: {task_id}")
+        logger.warning("Task not found: %s", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
 
     update_data = task_update.model_dump(exclude_unset=True)
@@ -282,18 +583,20 @@ def update_task(
 
     db.commit()
     db.refresh(db_task)
-    logger.info(f"Task updated: {db_task.title}")
+    logger.info("Task updated: %s", db_task.title)
+    publish_task_event("task_updated", db_task)
     return db_task
 
 
 @app.delete("/tasks/{task_id}", response_model=schemas.TaskResponse)
 def delete_task(task_id: int, db: db_dependency, current_user: current_user_dependency):
-    logger.info(f"Deleting task: {task_id} for user: {current_user.email}")
+    logger.info("Deleting task: %s for user: %s", task_id, current_user.email)
     db_task = crud.delete_task(db=db, task_id=task_id, user_id=current_user.id)
     if db_task is None:
-        logger.warning(f"Task not found: {task_id}")
+        logger.warning("Task not found: %s", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
-    logger.info(f"Task deleted: {db_task.title}")
+    logger.info("Task deleted: %s", db_task.title)
+    publish_task_event("task_deleted", db_task, deleted=True)
     return db_task
 
 
@@ -310,10 +613,10 @@ async def read_dashboard():
 @app.put("/users/me/password")
 async def change_password(
     current_user: current_user_dependency,
-    db: db_dependency,
+    db: async_db_dependency,
     body: dict = password_body
 ):
-    logger.info(f"User {current_user.email} is attempting to change password")
+    logger.info("User %s is attempting to change password", current_user.email)
     current_password = body.get("current_password")
     new_password = body.get("new_password")
 
@@ -324,16 +627,17 @@ async def change_password(
             detail="Необходимо указать текущий и новый пароль"
         )
 
-    if not auth.verify_password(current_password, current_user.password_hash):
-        logger.warning(f"User {current_user.email} provided invalid current password")
+    current_hash = await crud.get_user_password_hash_async(db, current_user.id)
+    if not current_hash or not await auth.verify_password_async(current_password, current_hash):
+        logger.warning("User %s provided invalid current password", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Неверный текущий пароль"
         )
 
-    user_update = schemas.UserUpdate(password=new_password)
-    crud.update_user(db, current_user.id, user_update)
-    logger.info(f"Password changed successfully for user: {current_user.email}")
+    password_hash = await auth.get_password_hash_async(new_password)
+    await crud.update_user_password_hash_async(db, current_user.id, password_hash)
+    logger.info("Password changed successfully for user: %s", current_user.email)
     return {"message": "Пароль успешно изменен"}
 
 
@@ -361,7 +665,7 @@ def get_admin_user(current_user: current_user_dependency):
     return current_user
 
 
-admin_user_dependency = Annotated[schemas.User, Depends(get_admin_user)]
+admin_user_dependency = Annotated[schemas.Principal, Depends(get_admin_user)]
 db_admin_dependency = Annotated[Session, Depends(get_db)]
 
 
@@ -369,13 +673,32 @@ db_admin_dependency = Annotated[Session, Depends(get_db)]
 def list_all_users(
     current_user: admin_user_dependency,
     db: db_admin_dependency,
+    response: Response,
+    cursor: cursor_dependency,
     skip: int = 0,
     limit: int = 10
 ):
-    logger.info(f"Admin {current_user.email} is listing all users (skip={skip}, limit={limit})")
-    users = crud.get_users(db, skip=skip, limit=limit)
-    logger.info(f"Admin {current_user.email} retrieved {len(users)} users")
-    return users
+    logger.info("Admin %s is listing all users (skip=%s, limit=%s)", current_user.email, skip, limit)
+    users = paginate(response, crud.get_users(db, skip=skip, limit=limit + 1, cursor=cursor), limit)
+    logger.info("Admin %s retrieved %s users", current_user.email, len(users))
+    return json_response([user_to_dict(user) for user in users], response)
+
+
+@app.get("/admin/auth-pool", response_model=schemas.PasswordPoolStats)
+def read_password_pool_stats(current_user: admin_user_dependency):
+    logger.info("Admin %s is reading password pool stats", current_user.email)
+    return auth.password_pool.stats()
+
+
+@app.get("/admin/cache-stats")
+def read_cache_stats(current_user: admin_user_dependency):
+    logger.info("Admin %s is reading cache stats", current_user.email)
+    return {"principal": principal_cache.stats(), "token": token_cache.stats()}
+
+
+@app.get("/metrics")
+def read_metrics(current_user: admin_user_dependency):
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.put("/admin/users/{user_id}/block", response_model=schemas.UserResponse)
@@ -386,30 +709,26 @@ def block_user(
     db: db_admin_dependency
 ):
     if user_id == current_user.id:
-        logger.warning(f"Admin {current_user.email} attempted to block themselves")
+        logger.warning("Admin %s attempted to block themselves", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot block yourself"
         )
 
-    db_user = crud.get_user(db, user_id)
+    db_user = crud.set_user_active(db, user_id, block_update.is_active)
     if not db_user:
-        logger.error(f"User with ID {user_id} not found for admin {current_user.email}")
+        logger.error("User with ID %s not found for admin %s", user_id, current_user.email)
         raise HTTPException(status_code=404, detail="User not found")
 
-    db_user.is_active = block_update.is_active
-    db.commit()
-    db.refresh(db_user)
-
     action = "unblocked" if block_update.is_active else "blocked"
-    logger.info(f"Admin {current_user.email} {action} user {db_user.email}")
+    logger.info("Admin %s %s user %s", current_user.email, action, db_user.email)
 
     return db_user
 
 
 @app.get("/token/verify")
 async def verify_token(current_user: current_user_dependency):
-    logger.info(f"Token verified for user {current_user.email}")
+    logger.info("Token verified for user %s", current_user.email, extra=SAMPLED)
     return {
         "valid": True,
         "user": current_user.email,
@@ -423,13 +742,13 @@ async def read_admin():
 
 
 @app.put("/admin/users/{user_id}/role", response_model=schemas.UserResponse)
-async def change_user_role(
+def change_user_role(
     user_id: int,
     role_update: schemas.UserRoleUpdate,
     current_user: admin_user_dependency,
     db: db_admin_dependency
 ):
-    logger.info(f"Admin {current_user.email} is changing role for user {user_id} to {role_update.role}")
+    logger.info("Admin %s is changing role for user %s to %s", current_user.email, user_id, role_update.role)
 
     if current_user.role != "admin":
         raise HTTPException(
@@ -439,7 +758,7 @@ async def change_user_role(
 
     user = crud.get_user(db, user_id)
     if not user:
-        logger.error(f"User with ID {user_id} not found for admin {current_user.email}")
+        logger.error("User with ID %s not found for admin %s", user_id, current_user.email)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Пользователь не найден"
@@ -452,7 +771,7 @@ async def change_user_role(
         )
 
     updated_user = crud.update_user_role(db, user_id, role_update.role)
-    logger.info(f"Admin {current_user.email} changed role for user {user.email} to {role_update.role}")
+    logger.info("Admin %s changed role for user %s to %s", current_user.email, user.email, role_update.role)
 
     return updated_user
 
@@ -460,11 +779,11 @@ async def change_user_role(
 @app.post("/users/me/check-password")
 async def check_password(
     current_user: current_user_dependency,
-    db: db_dependency,
+    db: read_db_dependency,
     body: dict = password_body
 ):
     password = body.get("password")
-    logger.info(f"User {current_user.email} is checking password")
+    logger.info("User %s is checking password", current_user.email)
 
     if not password:
         logger.warning("Password not provided for password check")
@@ -473,28 +792,42 @@ async def check_password(
             detail="Необходимо указать пароль"
         )
 
-    if not auth.verify_password(password, current_user.password_hash):
-        logger.warning(f"User {current_user.email} provided invalid password")
+    password_hash = await crud.get_user_password_hash_async(db, current_user.id)
+    if not password_hash or not await auth.verify_password_async(password, password_hash):
+        logger.warning("User %s provided invalid password", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный пароль"
         )
 
-    logger.info(f"User {current_user.email} password check successful")
+    logger.info("User %s password check successful", current_user.email)
     return {"message": "Пароль верный"}
 
 
-@app.get("/assigned-tasks/", response_model=List[schemas.TaskResponse])
-def read_assigned_tasks(
-    db: db_dependency,
+@app.get(
+    "/assigned-tasks/", response_model=List[schemas.TaskProjection], dependencies=[conditional_task_list_get]
+)
+async def read_assigned_tasks(
+    db: read_db_dependency,
     current_user: current_user_dependency,
+    response: Response,
+    cursor: cursor_dependency,
+    filters: task_filters_dependency,
+    fields: task_fields_dependency,
     skip: int = 0,
     limit: int = 10
 ):
-    logger.info(f"User {current_user.email} is retrieving assigned tasks (skip={skip}, limit={limit})")
-    tasks = crud.get_assigned_tasks(db, created_by_id=current_user.id, skip=skip, limit=limit)
-    logger.info(f"User {current_user.email} retrieved {len(tasks)} assigned tasks")
-    return tasks
+    logger.info(
+        "User %s is retrieving assigned tasks (skip=%s, limit=%s)", current_user.email, skip, limit, extra=SAMPLED
+    )
+    check_cursor_sort(cursor, filters)
+    tasks = await crud.get_assigned_tasks_async(
+        db, created_by_id=current_user.id, skip=skip, limit=limit + 1, filters=filters, cursor=cursor,
+        fields=fields
+    )
+    tasks = paginate(response, tasks, limit, keyset=filters.sort == schemas.TaskSort.CREATED_DESC)
+    logger.info("User %s retrieved %s assigned tasks", current_user.email, len(tasks), extra=SAMPLED)
+    return json_response(tasks_to_list(tasks, fields or TASK_RESPONSE_FIELDS), response)
 
 
 @app.put("/tasks/{task_id}/reassign", response_model=schemas.TaskResponse)
@@ -504,27 +837,62 @@ def reassign_task(
     db: db_dependency,
     current_user: current_user_dependency
 ):
-    logger.info(f"User {current_user.email} is reassigning task {task_id} to user {new_user_id}")
+    logger.info("User %s is reassigning task %s to user %s", current_user.email, task_id, new_user_id)
+    previous_user_id = crud.get_task_assignee_id(db, task_id)
     db_task = crud.reassign_task(db=db, task_id=task_id, new_user_id=new_user_id, created_by_id=current_user.id)
     if db_task is None:
-        logger.error(f"Task {task_id} not found or unauthorized access by user {current_user.email}")
+        logger.error("Task %s not found or unauthorized access by user %s", task_id, current_user.email)
         raise HTTPException(status_code=404, detail="Task not found or unauthorized access")
-    logger.info(f"User {current_user.email} successfully reassigned task {task_id}")
+    logger.info("User %s successfully reassigned task %s", current_user.email, task_id)
+    publish_task_event("task_reassigned", db_task, previous_user_id)
     return db_task
 
 
+@app.post("/assigned-tasks/reassign", response_model=schemas.TaskBulkReassignResponse)
+def reassign_tasks_bulk(
+    reassign: schemas.TaskBulkReassign,
+    db: db_dependency,
+    current_user: current_user_dependency
+):
+    logger.info(
+        "User %s is reassigning tasks from user %s to user %s",
+        current_user.email, reassign.from_user_id, reassign.to_user_id
+    )
+    if current_user.role not in ('pm', 'admin'):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    if not crud.get_existing_user_ids(db, {reassign.to_user_id}):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
+
+    ids = crud.reassign_tasks_bulk(
+        db,
+        created_by_id=current_user.id,
+        from_user_id=reassign.from_user_id,
+        to_user_id=reassign.to_user_id,
+        status=reassign.status,
+        due_before=reassign.due_before,
+        due_after=reassign.due_after
+    )
+    logger.info("User %s reassigned %s tasks to user %s", current_user.email, len(ids), reassign.to_user_id)
+    if ids:
+        event_hub.publish(
+            "tasks_changed", (current_user.id, reassign.from_user_id, reassign.to_user_id), {"task_ids": ids}
+        )
+    return {"count": len(ids), "ids": ids}
+
+
 @app.delete("/assigned-tasks/{task_id}", response_model=schemas.TaskResponse)
 def delete_assigned_task(
     task_id: int,
     db: db_dependency,
     current_user: current_user_dependency
 ):
-    logger.info(f"User {current_user.email} is attempting to delete assigned task {task_id}")
+    logger.info("User %s is attempting to delete assigned task %s", current_user.email, task_id)
     db_task = crud.delete_assigned_task(db=db, task_id=task_id, created_by_id=current_user.id)
     if db_task is None:
-        logger.error(f"Task {task_id} not found or unauthorized access by user {current_user.email}")
+        logger.error("Task %s not found or unauthorized access by user %s", task_id, current_user.email)
         raise HTTPException(status_code=404, detail="Task not found or unauthorized access")
-    logger.info(f"User {current_user.email} successfully deleted assigned task {task_id}")
+    logger.info("User %s successfully deleted assigned task %s", current_user.email, task_id)
+    publish_task_event("task_deleted", db_task, deleted=True)
     return db_task
 
 
@@ -535,20 +903,20 @@ def verify_reset_credentials(
 ):
     user = crud.get_user_by_email(db, reset_request.email)
     if not user:
-        logger.warning(f"Password reset attempted for non-existent email: {reset_request.email}")
+        logger.warning("Password reset attempted for non-existent email: %s", reset_request.email)
         raise HTTPException(
             status_code=404,
             detail="Пользователь с таким email не найден"
         )
 
     if not auth.verify_secret_word(reset_request.secret_word, user.secret_word):
-        logger.warning(f"Invalid secret word provided for password reset: {reset_request.email}")
+        logger.warning("Invalid secret word provided for password reset: %s", reset_request.email)
         raise HTTPException(
             status_code=400,
             detail="Неверное кодовое слово"
         )
 
-    logger.info(f"Password reset credentials verified for user: {reset_request.email}")
+    logger.info("Password reset credentials verified for user: %s", reset_request.email)
     return {"message": "Данные подтверждены"}
 
 
@@ -559,24 +927,23 @@ def reset_password(
 ):
     user = crud.get_user_by_email(db, reset_data.email)
     if not user:
-        logger.warning(f"Password reset attempted for non-existent email: {reset_data.email}")
+        logger.warning("Password reset attempted for non-existent email: %s", reset_data.email)
         raise HTTPException(
             status_code=404,
             detail="Пользователь с таким email не найден"
         )
 
     if not auth.verify_secret_word(reset_data.secret_word, user.secret_word):
-        logger.warning(f"Invalid secret word provided for password reset: {reset_data.email}")
+        logger.warning("Invalid secret word provided for password reset: %s", reset_data.email)
         raise HTTPException(
             status_code=400,
             detail="Неверное кодовое слово"
         )
 
     hashed_password = auth.get_password_hash(reset_data.new_password)
-    user.password_hash = hashed_password
-    db.commit()
+    crud.update_user_password_hash(db, user.id, hashed_password)
 
-    logger.info(f"Password successfully reset for user: {reset_data.email}")
+    logger.info("Password successfully reset for user: %s", reset_data.email)
     return {"message": "Пароль успешно изменен"}
 
 
@@ -584,10 +951,10 @@ def reset_password(
 async def upload_task_file(
     task_id: int,
     file: UploadFile,
-    db: db_dependency,
+    db: async_db_dependency,
     current_user: current_user_dependency
 ):
-    task = crud.get_task(db, task_id, current_user.id)
+    task = await crud.get_task_async(db, task_id, current_user.id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -595,30 +962,45 @@ async def upload_task_file(
     if not validate_file_type(filename):
         raise HTTPException(status_code=400, detail="Invalid file type")
 
-    file_data = await file.read()
-    if not validate_file_size(len(file_data)):
+    try:
+        blob = await storage.save(file, max_size=MAX_FILE_SIZE)
+    except FileTooLargeError:
         raise HTTPException(status_code=400, detail="File too large")
 
     try:
-        db_file = crud.create_task_file(db, task_id, filename, file_data)
-        return {"id": db_file.id, "filename": db_file.filename}
-    except Exception as e:
-        logger.error(f"Error uploading file: {e}")
+        try:
+            db_file = await crud.create_task_file_async(db, task_id, filename, blob)
+        except BlobMissingError:
+            # A concurrent delete collected the stored blob this upload reused
+            await file.seek(0)
+            blob = await storage.save(file, max_size=MAX_FILE_SIZE)
+            db_file = await crud.create_task_file_async(db, task_id, filename, blob)
+    except (SQLAlchemyError, BlobMissingError, OSError) as e:
+        logger.error("Error uploading file: %s", e)
+        # Without its row the blob is unreferenced, unless an identical upload recorded one meanwhile
+        await db.rollback()
+        await crud.release_blobs_async(db, [blob.key])
         raise HTTPException(status_code=500, detail="Could not upload file")
 
+    event_hub.publish(
+        "file_added", (task.user_id, task.created_by_id),
+        {"task_id": task_id, "file": {"id": db_file.id, "filename": db_file.filename}}
+    )
+    return {"id": db_file.id, "filename": db_file.filename}
+
 
 @app.get("/tasks/{task_id}/files/", response_model=List[schemas.TaskFileResponse])
 async def get_task_files(
     task_id: int,
-    db: db_dependency,
+    db: read_db_dependency,
     current_user: current_user_dependency
 ):
     """Получить список всех файлов задачи"""
-    task = crud.get_task(db, task_id, current_user.id)
+    task = await crud.get_task_async(db, task_id, current_user.id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    files = crud.get_task_files(db, task_id)
+    files = await crud.get_task_files_async(db, task_id)
     return files
 
 
@@ -626,33 +1008,30 @@ async def get_task_files(
 async def download_task_file(
     task_id: int,
     file_id: int,
-    db: db_dependency,
+    request: Request,
+    db: read_db_dependency,
     current_user: current_user_dependency
 ):
-    file = crud.get_task_file(db, file_id=file_id)
-    if not file or file.task_id != task_id:
-        raise HTTPException(status_code=404, detail="Файл не найден")
-
-    task = crud.get_task(db, task_id=task_id, user_id=current_user.id)
+    task = await crud.get_task_async(db, task_id=task_id, user_id=current_user.id)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
 
-    if task.user_id != current_user.id and task.creator_id != current_user.id and current_user.role not in ['admin', 'pm']:
-        raise HTTPException(status_code=403, detail="Нет доступа к файлу")
-
-    filename_encoded = quote(file.filename)
+    file = await crud.get_task_file_async(db, file_id=file_id)
+    if not file or file.task_id != task_id:
+        raise HTTPException(status_code=404, detail="Файл не найден")
 
-    return Response(
-        content=file.data,
-        media_type=file.content_type,
-        headers={
-            'Content-Disposition': f'attachment; filename*=UTF-8\'\'{filename_encoded}'
-        }
+    return build_file_response(
+        file,
+        request.headers,
+        storage,
+        read_inline=lambda offset, length: crud.iter_task_file_data_async(
+            db, file.id, offset, length, ATTACHMENT_CHUNK_SIZE
+        )
     )
 
 
 @app.delete("/tasks/{task_id}/files/{file_id}", response_model=schemas.TaskFileResponse)
-async def delete_task_file(
+def delete_task_file(
     task_id: int,
     file_id: int,
     db: db_dependency,
@@ -672,8 +1051,11 @@ async def delete_task_file(
     try:
         deleted_file = crud.delete_task_file(db, file_id)
         if deleted_file:
+            event_hub.publish(
+                "file_deleted", (task.user_id, task.created_by_id), {"task_id": task_id, "file": {"id": file_id}}
+            )
             return deleted_file
         raise HTTPException(status_code=404, detail="Файл не найден")
     except Exception as e:
-        logger.error(f"Error deleting file: {e}")
+        logger.error("Error deleting file: %s", e)
         raise HTTPException(status_code=500, detail="Не удалось удалить файл")
@@ -1,22 +1,36 @@
+from contextlib import contextmanager
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from backend.database import Base
+from backend.database import Base, apply_sqlite_profile
 from main import app
-from backend.utils import get_db
+from backend.utils import get_async_db, get_async_read_db, get_db
 from backend.rate_limiter import rate_limiter
+from backend.cache import principal_cache, token_cache
+from backend.storage import storage
 
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# The sync and async engines need to see the same data, so the tests use a throwaway database file
+TEST_DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DATABASE_PATH}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+apply_sqlite_profile(engine, "production")
+apply_sqlite_profile(async_engine.sync_engine, "production")
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 @pytest.fixture(scope="function")
@@ -38,7 +52,13 @@ def client(db_session):
         finally:
             db_session.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -81,17 +101,48 @@ def create_task(client, auth_headers):
     return _create_task
 
 
+@pytest.fixture
+def capture_sql():
+    @contextmanager
+    def _capture_sql():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engines = (engine, async_engine.sync_engine)
+        for target in engines:
+            event.listen(target, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for target in engines:
+                event.remove(target, "before_cursor_execute", record)
+    return _capture_sql
+
+
+@pytest.fixture(autouse=True)
+def attachment_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "root", str(tmp_path / "uploads"))
+    return storage
+
+
 @pytest.fixture(autouse=True)
 def reset_rate_limiter():
-    rate_limiter.attempts = {}
-    rate_limiter.blocked_until = {}
+    rate_limiter.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    principal_cache.clear()
+    token_cache.clear()
     yield
 
 
 @pytest.fixture
 def auth_headers(client):
-    rate_limiter.attempts = {}
-    rate_limiter.blocked_until = {}
+    rate_limiter.reset()
 
     register_response = client.post(
         "/users/",
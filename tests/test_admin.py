@@ -7,8 +7,7 @@ from backend.rate_limiter import rate_limiter
 
 @pytest.fixture
 def admin_headers(client):
-    rate_limiter.attempts = {}
-    rate_limiter.blocked_until = {}
+    rate_limiter.reset()
     response = client.post(
         "/users/",
         json={
@@ -153,8 +152,6 @@ def test_role_hierarchy(client, admin_headers):
     users = {}
 
     for role in roles:
-        rate_limiter.attempts = {}
-        rate_limiter.blocked_until = {}
         email = f"{role}@example.com"
         rate_limiter.reset()
 
@@ -188,3 +185,20 @@ def test_role_hierarchy(client, admin_headers):
     for _, headers in users.items():
         response = client.get("/users", headers=headers)
         assert response.status_code == status.HTTP_200_OK
+
+
+def test_users_cursor_pagination(client, admin_headers):
+    for i in range(3):
+        client.post(
+            "/users/",
+            json={"email": f"page{i}@example.com", "password": "testpass123", "secret_word": "secret"}
+        )
+
+    first = client.get("/users/", headers=admin_headers, params={"limit": 2})
+    assert first.status_code == status.HTTP_200_OK
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/users/", headers=admin_headers, params={"limit": 2, "cursor": cursor})
+    emails = [user["email"] for user in first.json() + second.json()]
+    assert emails == [ADMIN_EMAIL, "page0@example.com", "page1@example.com", "page2@example.com"]
+    assert "X-Next-Cursor" not in second.headers
@@ -1,5 +1,9 @@
+import threading
+
 from fastapi import status
 
+from backend import auth, crud
+from backend.cache import principal_cache, token_cache
 from backend.rate_limiter import rate_limiter
 
 
@@ -322,3 +326,86 @@ def test_rate_limiter(client):
 
     assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
     assert "Слишком много попыток" in response.json()["detail"]
+
+
+def test_login_rejected_when_password_pool_saturated(client, monkeypatch):
+    client.post(
+        "/users/",
+        json={
+            "email": "busy@example.com",
+            "password": "testpass123",
+            "secret_word": "secret"
+        }
+    )
+    pool = auth.PasswordPool(max_workers=1, max_queue=0)
+    monkeypatch.setattr(auth, "password_pool", pool)
+    release = threading.Event()
+    blocker = pool.submit(release.wait)
+
+    try:
+        response = client.post(
+            "/token",
+            data={
+                "username": "busy@example.com",
+                "password": "testpass123"
+            }
+        )
+    finally:
+        release.set()
+        blocker.result()
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+    assert pool.stats()["rejected_total"] == 1
+
+
+def test_rate_limiter_rejects_early_with_retry_after(client):
+    rate_limiter.reset("slow@example.com")
+
+    first = client.post("/token", data={"username": "slow@example.com", "password": "wrongpass"})
+    assert first.status_code == status.HTTP_401_UNAUTHORIZED
+
+    second = client.post("/token", data={"username": "slow@example.com", "password": "wrongpass"})
+    assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(second.headers["Retry-After"]) >= 1
+
+
+def test_principal_cache_hits_and_invalidation(client, auth_headers, db_session, capture_sql):
+    principal_cache.clear()
+    client.get("/token/verify", headers=auth_headers)
+
+    with capture_sql() as statements:
+        response = client.get("/token/verify", headers=auth_headers)
+    assert response.json()["role"] == "default"
+    assert statements == []
+    assert principal_cache.stats()["hits"] == 1
+
+    user_id = client.get("/users/me/summary", headers=auth_headers).json()["id"]
+    crud.update_user_role(db_session, user_id, "pm")
+
+    response = client.get("/token/verify", headers=auth_headers)
+    assert response.json()["role"] == "pm"
+
+
+def test_password_checks_read_the_current_hash(client, auth_headers, db_session):
+    client.get("/token/verify", headers=auth_headers)
+    # As another worker would: the principal cached by this process is not invalidated
+    user = crud.get_user_by_email(db_session, "test@example.com")
+    user.password_hash = auth.get_password_hash("newpass123")
+    db_session.commit()
+
+    old = client.post("/users/me/check-password", headers=auth_headers, json={"password": "testpass123"})
+    assert old.status_code == status.HTTP_401_UNAUTHORIZED
+    new = client.post("/users/me/check-password", headers=auth_headers, json={"password": "newpass123"})
+    assert new.status_code == status.HTTP_200_OK
+
+
+def test_decode_access_token_uses_cache():
+    token = auth.create_access_token(data={"sub": "cached@example.com"})
+
+    assert auth.decode_access_token(token)["sub"] == "cached@example.com"
+    assert auth.decode_access_token(token)["sub"] == "cached@example.com"
+    assert token_cache.stats()["hits"] == 1
+
+    assert auth.decode_access_token(token + "tampered") is None
+    assert token_cache.stats()["size"] == 1
@@ -0,0 +1,66 @@
+import re
+
+from fastapi import status
+
+from backend import crud
+
+
+def revalidate(client, url, headers, etag):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+def test_task_list_not_modified(client, auth_headers, capture_sql):
+    client.post("/tasks/", headers=auth_headers, json={"title": "Task"})
+    response = client.get("/tasks/", headers=auth_headers)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    with capture_sql() as statements:
+        response = revalidate(client, "/tasks/", auth_headers, etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert not any(re.search(r"\b(tasks|task_files)\b", statement) for statement in statements)
+
+    assert revalidate(client, "/tasks/", auth_headers, f'"other", {etag}').status_code == 304
+    assert revalidate(client, "/tasks/", auth_headers, etag.removeprefix("W/")).status_code == 304
+
+
+def test_task_writes_change_the_etag(client, auth_headers, user_headers, db_session):
+    pm_id = crud.get_user_by_email(db_session, "test@example.com").id
+    crud.update_user_role(db_session, pm_id, "pm")
+    user_id = crud.get_user_by_email(db_session, "user@example.com").id
+    user_etag = client.get("/tasks/", headers=user_headers).headers["ETag"]
+    pm_etag = client.get("/assigned-tasks/", headers=auth_headers).headers["ETag"]
+
+    client.post("/tasks/", headers=user_headers, json={"title": "Own task"})
+    assert revalidate(client, "/assigned-tasks/", auth_headers, pm_etag).status_code == 304
+    response = revalidate(client, "/tasks/", user_headers, user_etag)
+    assert response.status_code == status.HTTP_200_OK
+    user_etag = response.headers["ETag"]
+
+    task = {"title": "Handed out", "user_id": user_id}
+    task_id = client.post("/tasks/", headers=auth_headers, json=task).json()["id"]
+    assert revalidate(client, "/tasks/", user_headers, user_etag).status_code == 200
+    assert revalidate(client, "/assigned-tasks/", auth_headers, pm_etag).status_code == 200
+
+    detail_etag = client.get(f"/tasks/{task_id}", headers=user_headers).headers["ETag"]
+    response = client.post(
+        f"/tasks/{task_id}/files/", headers=user_headers, files={"file": ("spec.pdf", b"%PDF-1.4", "application/pdf")}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert revalidate(client, f"/tasks/{task_id}", user_headers, detail_etag).status_code == 200
+
+
+def test_profile_changes_change_the_etag(client, auth_headers, db_session):
+    etag = client.get("/users/me/", headers=auth_headers).headers["ETag"]
+    assert revalidate(client, "/users/me/summary", auth_headers, etag).status_code == 304
+
+    crud.update_user_role(db_session, crud.get_user_by_email(db_session, "test@example.com").id, "pm")
+    assert revalidate(client, "/users/me/", auth_headers, etag).status_code == 200
+
+
+def test_overdue_list_is_not_cached(client, auth_headers):
+    response = client.get("/tasks/", headers=auth_headers, params={"overdue": True})
+    assert response.status_code == status.HTTP_200_OK
+    assert "ETag" not in response.headers
@@ -52,3 +52,22 @@ def test_error_logging(client, auth_headers, caplog):
 
     assert "Task not found" in caplog.text
     assert "99999" in caplog.text
+
+
+def test_get_task_visibility(client, db_session):
+    creator, assignee = [
+        crud.create_user(db_session, schemas.UserCreate(email=email, password="testpass123", secret_word="secret"))
+        for email in ("creator@example.com", "assignee@example.com")
+    ]
+    task = crud.create_task(
+        db_session,
+        schemas.TaskCreate(title="Task", description="Description"),
+        user_id=assignee.id,
+        created_by_id=creator.id
+    )
+
+    assert crud.get_task(db_session, task.id, assignee.id).id == task.id
+    assert crud.get_task(db_session, task.id, creator.id) is None
+
+    crud.update_user_role(db_session, creator.id, "pm")
+    assert crud.get_task(db_session, task.id, creator.id).id == task.id
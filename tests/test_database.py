@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend import database
+from backend.database import build_engine
+
+
+def test_production_profile_pragmas(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'app.db'}", profile="production")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2
+    engine.dispose()
+
+
+def test_legacy_profile_keeps_defaults(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'app.db'}", profile="legacy")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    engine.dispose()
+
+
+def test_unknown_profile(tmp_path):
+    with pytest.raises(ValueError):
+        build_engine(f"sqlite:///{tmp_path / 'app.db'}", profile="fast")
+
+
+def test_read_only_engine_rejects_writes(tmp_path):
+    path = tmp_path / "app.db"
+    writer = build_engine(f"sqlite:///{path}")
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO items (id) VALUES (1)"))
+
+    reader = build_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM items")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO items (id) VALUES (2)"))
+    reader.dispose()
+    writer.dispose()
+
+
+def test_failing_pragma_does_not_skip_the_rest(tmp_path, monkeypatch):
+    monkeypatch.setitem(database.SQLITE_PROFILES, "broken", {"no_such_pragma": "(", "busy_timeout": 1234})
+    engine = build_engine(f"sqlite:///{tmp_path / 'app.db'}", profile="broken")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    engine.dispose()
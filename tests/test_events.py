@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+
+from fastapi import status
+
+from backend import crud
+from backend.events import EventHub, event_hub
+
+
+def parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_hub_delivers_to_subscribers_of_the_user():
+    async def scenario():
+        hub = EventHub(queue_size=10)
+        subscription = hub.subscribe(1)
+        other = hub.subscribe(2)
+        stream = hub.stream(subscription, heartbeat=0.01)
+        assert (await anext(stream)).startswith("retry: ")
+
+        publisher = threading.Thread(target=hub.publish, args=("task_updated", [1, 1, 3], {"task_id": 5}))
+        publisher.start()
+        publisher.join()
+        assert parse(await anext(stream)) == ("task_updated", {"task_id": 5})
+        assert other.queue.empty()
+
+        assert await anext(stream) == ": keep-alive\n\n"
+        await stream.aclose()
+        assert len(hub) == 1
+
+    asyncio.run(scenario())
+
+
+def test_hub_disconnects_slow_consumers():
+    async def scenario():
+        hub = EventHub(queue_size=2)
+        subscription = hub.subscribe(1)
+        stream = hub.stream(subscription)
+        await anext(stream)
+        for task_id in range(3):
+            hub.publish("task_updated", [1], {"task_id": task_id})
+        await asyncio.sleep(0)
+
+        assert subscription.closed
+        assert [message async for message in stream] == []
+        assert len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+def test_task_handlers_publish_events(client, auth_headers, user_headers, db_session):
+    pm_id = crud.get_user_by_email(db_session, "test@example.com").id
+    crud.update_user_role(db_session, pm_id, "pm")
+    user_id = crud.get_user_by_email(db_session, "user@example.com").id
+
+    loop = asyncio.new_event_loop()
+
+    async def subscribe():
+        return event_hub.subscribe(user_id)
+
+    subscription = loop.run_until_complete(subscribe())
+    try:
+        task_id = client.post("/tasks/", headers=auth_headers, json={"title": "A", "user_id": user_id}).json()["id"]
+        client.put(f"/tasks/{task_id}", headers=user_headers, json={"status": 1})
+        client.put(f"/tasks/{task_id}/reassign", headers=auth_headers, params={"new_user_id": pm_id})
+        client.post("/tasks/", headers=auth_headers, json={"title": "Not for the user"})
+        client.post("/tasks/bulk", headers=auth_headers, json={"tasks": [{"title": "B", "user_id": user_id}]})
+        loop.run_until_complete(asyncio.sleep(0))
+    finally:
+        event_hub.unsubscribe(subscription)
+        loop.close()
+
+    events = []
+    while not subscription.queue.empty():
+        events.append(parse(subscription.queue.get_nowait()))
+    assert [event for event, _ in events] == ["task_created", "task_updated", "task_reassigned", "tasks_changed"]
+    assert events[1][1]["task"]["status"] == 1
+    assert events[2][1]["task"]["user_id"] == pm_id
+
+
+def test_event_stream_requires_a_stream_ticket(client, auth_headers):
+    response = client.get("/events", params={"ticket": "not-a-token"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    access_token = auth_headers["Authorization"].removeprefix("Bearer ")
+    response = client.get("/events", params={"ticket": access_token})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get("/events", params={"token": access_token}).status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+    response = client.post("/events/ticket", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["expires_in"] <= 60
+    ticket = response.json()["ticket"]
+    response = client.get("/tasks/", headers={"Authorization": f"Bearer {ticket}"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_stream_ticket_opens_the_stream(client, auth_headers, monkeypatch):
+    ticket = client.post("/events/ticket", headers=auth_headers).json()["ticket"]
+
+    async def closed_stream(subscription, heartbeat=None):
+        event_hub.unsubscribe(subscription)
+        yield "retry: 1\n\n"
+
+    monkeypatch.setattr(event_hub, "stream", closed_stream)
+    response = client.get("/events", params={"ticket": ticket})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "retry: 1\n\n"
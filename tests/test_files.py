@@ -0,0 +1,189 @@
+from pathlib import Path
+
+from fastapi import status
+
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend import crud, models
+from backend.manage import move_attachments
+from backend.storage import BlobMissingError
+
+
+def _create_task(client, headers):
+    response = client.post(
+        "/tasks/",
+        headers=headers,
+        json={"title": "Task with files", "description": "Test Description"}
+    )
+    return response.json()["id"]
+
+
+def test_upload_stores_blob_outside_database(client, auth_headers, db_session, attachment_storage):
+    task_id = _create_task(client, auth_headers)
+
+    response = client.post(
+        f"/tasks/{task_id}/files/",
+        headers=auth_headers,
+        files={"file": ("report.pdf", b"%PDF-1.4 report", "application/pdf")}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    db_file = db_session.get(models.TaskFile, response.json()["id"])
+    assert db_file.data == b""
+    assert db_file.size == len(b"%PDF-1.4 report")
+    assert attachment_storage.exists(db_file.blob_key)
+
+    download = client.get(f"/tasks/{task_id}/files/{db_file.id}", headers=auth_headers)
+    assert download.status_code == status.HTTP_200_OK
+    assert download.content == b"%PDF-1.4 report"
+
+
+def test_upload_too_large(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("main.MAX_FILE_SIZE", 8)
+    task_id = _create_task(client, auth_headers)
+
+    response = client.post(
+        f"/tasks/{task_id}/files/",
+        headers=auth_headers,
+        files={"file": ("big.png", b"0123456789", "image/png")}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_identical_uploads_share_blob(client, auth_headers, attachment_storage):
+    task_id = _create_task(client, auth_headers)
+    first = client.post(
+        f"/tasks/{task_id}/files/", headers=auth_headers, files={"file": ("a.png", b"same", "image/png")}
+    ).json()
+    second = client.post(
+        f"/tasks/{task_id}/files/", headers=auth_headers, files={"file": ("b.png", b"same", "image/png")}
+    ).json()
+
+    client.delete(f"/tasks/{task_id}/files/{first['id']}", headers=auth_headers)
+    download = client.get(f"/tasks/{task_id}/files/{second['id']}", headers=auth_headers)
+    assert download.content == b"same"
+
+    client.delete(f"/tasks/{task_id}/files/{second['id']}", headers=auth_headers)
+    assert not any(path.is_file() for path in Path(attachment_storage.root).rglob("*"))
+
+
+def test_blob_with_a_reference_is_not_collected(client, auth_headers, db_session, attachment_storage):
+    task_id = _create_task(client, auth_headers)
+    file_id = client.post(
+        f"/tasks/{task_id}/files/", headers=auth_headers, files={"file": ("a.png", b"kept", "image/png")}
+    ).json()["id"]
+    blob_key = db_session.get(models.TaskFile, file_id).blob_key
+    assert db_session.get(models.BlobRef, blob_key).count == 1
+
+    # A collection racing with the upload sees the committed reference and leaves the blob alone
+    crud._release_blobs(db_session, [blob_key])
+    assert attachment_storage.exists(blob_key)
+
+    crud.delete_task_file(db_session, file_id)
+    assert not attachment_storage.exists(blob_key)
+    assert db_session.get(models.BlobRef, blob_key) is None
+
+
+def test_failed_upload_releases_its_blob(client, auth_headers, attachment_storage, monkeypatch):
+    task_id = _create_task(client, auth_headers)
+
+    async def fail(*args, **kwargs):
+        raise SQLAlchemyError("disk I/O error")
+
+    monkeypatch.setattr(crud, "create_task_file_async", fail)
+    response = client.post(
+        f"/tasks/{task_id}/files/", headers=auth_headers, files={"file": ("a.png", b"orphan", "image/png")}
+    )
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert not any(path.is_file() for path in Path(attachment_storage.root).rglob("*"))
+
+
+def test_reference_to_a_collected_blob_is_refused(client, auth_headers, db_session, attachment_storage):
+    task_id = _create_task(client, auth_headers)
+    blob = attachment_storage.save_bytes(b"collected")
+    attachment_storage.delete(blob.key)
+
+    with pytest.raises(BlobMissingError):
+        crud.create_task_file(db_session, task_id, "a.png", blob)
+    assert db_session.query(models.TaskFile).count() == 0
+
+
+def test_move_attachments(client, auth_headers, db_session, attachment_storage):
+    task_id = _create_task(client, auth_headers)
+    legacy = models.TaskFile(
+        filename="legacy.jpg", content_type="image/jpeg", data=b"legacy bytes", size=12, task_id=task_id
+    )
+    db_session.add(legacy)
+    db_session.commit()
+
+    assert move_attachments(db_session) == 1
+
+    db_session.refresh(legacy)
+    assert legacy.data == b""
+    assert attachment_storage.open(legacy.blob_key).read() == b"legacy bytes"
+    assert crud.get_inline_task_file_ids(db_session) == []
+
+
+def test_download_range_and_conditional_requests(client, auth_headers):
+    task_id = _create_task(client, auth_headers)
+    file_id = client.post(
+        f"/tasks/{task_id}/files/", headers=auth_headers, files={"file": ("data.pdf", b"0123456789", "application/pdf")}
+    ).json()["id"]
+    url = f"/tasks/{task_id}/files/{file_id}"
+
+    full = client.get(url, headers=auth_headers)
+    assert full.status_code == status.HTTP_200_OK
+    etag = full.headers["etag"]
+    assert full.headers["last-modified"]
+
+    partial = client.get(url, headers={**auth_headers, "Range": "bytes=2-5"})
+    assert partial.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert partial.content == b"2345"
+    assert partial.headers["content-range"] == "bytes 2-5/10"
+
+    not_modified = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    stale_range = client.get(url, headers={**auth_headers, "Range": "bytes=2-5", "If-Range": '"stale"'})
+    assert stale_range.status_code == status.HTTP_200_OK
+    assert stale_range.content == b"0123456789"
+
+
+def test_download_inline_blob_range(client, auth_headers, db_session):
+    task_id = _create_task(client, auth_headers)
+    legacy = models.TaskFile(
+        filename="legacy.pdf", content_type="application/pdf", data=b"abcdefghij", size=10, task_id=task_id
+    )
+    db_session.add(legacy)
+    db_session.commit()
+    url = f"/tasks/{task_id}/files/{legacy.id}"
+
+    assert client.get(url, headers=auth_headers).content == b"abcdefghij"
+
+    partial = client.get(url, headers={**auth_headers, "Range": "bytes=-3"})
+    assert partial.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert partial.content == b"hij"
+
+    unsatisfiable = client.get(url, headers={**auth_headers, "Range": "bytes=20-30"})
+    assert unsatisfiable.status_code == 416
+
+
+def test_file_listings_never_read_blob_column(client, auth_headers, db_session, capture_sql):
+    task_id = _create_task(client, auth_headers)
+    db_session.add(models.TaskFile(
+        filename="inline.png", content_type="image/png", data=b"x" * 1024, size=1024, task_id=task_id
+    ))
+    db_session.commit()
+    db_session.expire_all()
+
+    with capture_sql() as statements:
+        files = client.get(f"/tasks/{task_id}/files/", headers=auth_headers).json()
+        tasks = client.get("/tasks/", headers=auth_headers).json()
+        task = client.get(f"/tasks/{task_id}", headers=auth_headers).json()
+
+    assert [file["filename"] for file in files] == ["inline.png"]
+    assert tasks[0]["files"][0]["size"] == 1024
+    assert task["files"][0]["content_type"] == "image/png"
+    assert statements
+    assert not any("task_files.data" in statement for statement in statements)
@@ -0,0 +1,47 @@
+import gzip
+import logging
+
+from backend.logger import AppLogger, DeferredQueueHandler, SamplingFilter, parse_levels, setup_logger, _gzip_rotator
+
+
+def make_record(msg, *args, sampled=False, name="backend.test"):
+    record = logging.LogRecord(name, logging.INFO, __file__, 1, msg, args, None)
+    if sampled:
+        record.sampled = True
+    return record
+
+
+def test_loggers_keep_their_module_names():
+    assert setup_logger("backend.first").name == "backend.first"
+    assert setup_logger("backend.second").name == "backend.second"
+
+
+def test_sampling_filter_keeps_every_nth_sampled_record():
+    sampling = SamplingFilter(every=3)
+    kept = [sampling.filter(make_record("Successfully %s", "op", sampled=True)) for _ in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+    assert all(sampling.filter(make_record("Task not found: %s", 1)) for _ in range(5))
+
+
+def test_per_module_levels(monkeypatch):
+    monkeypatch.setattr(AppLogger, "_levels", parse_levels("backend=WARNING, backend.auth=debug"))
+    assert AppLogger._level_for("backend.crud") == logging.WARNING
+    assert AppLogger._level_for("backend.auth") == logging.DEBUG
+    assert AppLogger._level_for("main") == logging.INFO
+
+
+def test_queue_handler_merges_arguments_lazily():
+    record = make_record("Stored blob %s (%s bytes)", "abc", 10)
+    prepared = DeferredQueueHandler(None).prepare(record)
+    assert prepared.msg == "Stored blob abc (10 bytes)"
+    assert prepared.args is None
+    assert record.args == ("abc", 10)
+
+
+def test_rotated_logs_are_compressed(tmp_path):
+    source = tmp_path / "app.log"
+    source.write_text("line\n" * 100)
+    _gzip_rotator(str(source), str(tmp_path / "app.log.1.gz"))
+    assert not source.exists()
+    with gzip.open(tmp_path / "app.log.1.gz", "rt") as rotated:
+        assert rotated.read() == "line\n" * 100
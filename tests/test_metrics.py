@@ -0,0 +1,47 @@
+from fastapi import status
+
+from backend import crud
+from backend.metrics import Counter, Histogram, HTTP_REQUESTS, DB_QUERY_DURATION, PASSWORD_HASH_DURATION
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("request_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3):
+        histogram.observe(value, "/tasks/")
+
+    lines = histogram.render()
+    assert '# TYPE request_seconds histogram' in lines
+    assert 'request_seconds_bucket{route="/tasks/",le="0.1"} 1' in lines
+    assert 'request_seconds_bucket{route="/tasks/",le="1.0"} 3' in lines
+    assert 'request_seconds_bucket{route="/tasks/",le="+Inf"} 4' in lines
+    assert 'request_seconds_count{route="/tasks/"} 4' in lines
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("events_total", "Events.", ("name",))
+    counter.inc('say "hi"', amount=2)
+    assert counter.render()[-1] == 'events_total{name="say \\"hi\\""} 2'
+
+
+def test_requests_are_recorded_per_route_template(client, auth_headers):
+    before = HTTP_REQUESTS.value("GET", "/tasks/{task_id}", "404")
+    client.get("/tasks/99999", headers=auth_headers)
+    client.get("/tasks/12345", headers=auth_headers)
+    assert HTTP_REQUESTS.value("GET", "/tasks/{task_id}", "404") == before + 2
+    assert PASSWORD_HASH_DURATION.count("verify") > 0
+
+
+def test_metrics_endpoint_requires_admin(client, db_session, auth_headers):
+    response = client.get("/metrics", headers=auth_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    user = crud.get_user_by_email(db_session, "test@example.com")
+    crud.update_user_role(db_session, user.id, "admin")
+    response = client.get("/metrics", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'http_requests_total{method="POST",route="/token",status="200"}' in response.text
+    assert "password_pool_running" in response.text
+    assert 'cache_hits{cache="principal"}' in response.text
+    assert DB_QUERY_DURATION.name in response.text
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import HTTPException
+
+from backend.rate_limiter import AttemptRecord, MemoryRateLimitStore, RateLimiter, RateLimitStoreFull, SQLiteRateLimitStore
+
+
+def test_memory_store_is_bounded():
+    limiter = RateLimiter(MemoryRateLimitStore(max_entries=100))
+    for i in range(1000):
+        limiter.add_attempt(f"user{i}@example.com")
+
+    assert len(limiter.store) == 100
+    assert limiter.store.get("user999@example.com").current == 1
+    assert limiter.store.get("user0@example.com") is None
+
+
+def block(limiter, email):
+    for _ in range(limiter.max_attempts):
+        limiter.add_attempt(email)
+    with pytest.raises(HTTPException):
+        limiter.check_rate_limit(email)
+
+
+def test_memory_store_never_evicts_a_live_block():
+    limiter = RateLimiter(MemoryRateLimitStore(max_entries=100))
+    limiter.progressive_delay = 0
+    block(limiter, "victim@example.com")
+    for i in range(1000):
+        limiter.add_attempt(f"user{i}@example.com")
+
+    assert len(limiter.store) == 100
+    with pytest.raises(HTTPException) as exc_info:
+        limiter.check_rate_limit("victim@example.com")
+    assert int(exc_info.value.headers["Retry-After"]) > limiter.attempt_window.total_seconds()
+    assert limiter.store.get("victim@example.com").blocked_until > 0
+
+
+def test_memory_store_full_of_blocks_rejects_new_keys():
+    limiter = RateLimiter(MemoryRateLimitStore(max_entries=2))
+    limiter.progressive_delay = 0
+    block(limiter, "first@example.com")
+    block(limiter, "second@example.com")
+
+    with pytest.raises(RateLimitStoreFull):
+        limiter.store.update("third@example.com", lambda _: AttemptRecord(0, 1, 0, 0, 0), 60)
+    with pytest.raises(HTTPException) as exc_info:
+        limiter.add_attempt("third@example.com")
+    assert exc_info.value.status_code == 429
+    assert limiter.store.get("first@example.com").blocked_until > 0
+    assert limiter.store.get("second@example.com").blocked_until > 0
+
+
+def test_memory_store_sweeps_in_expiry_order():
+    store = MemoryRateLimitStore()
+    store.update("long@example.com", lambda _: AttemptRecord(0, 1, 0, 0, 0), 60)
+    store.update("short@example.com", lambda _: AttemptRecord(0, 1, 0, 0, 0), 0)
+    store.update("next@example.com", lambda _: AttemptRecord(0, 1, 0, 0, 0), 60)
+
+    assert len(store) == 2
+    assert store.get("long@example.com") is not None
+
+
+def test_sqlite_store_is_shared_between_limiters(tmp_path):
+    path = str(tmp_path / "rate_limits.db")
+    first = RateLimiter(SQLiteRateLimitStore(path))
+    second = RateLimiter(SQLiteRateLimitStore(path))
+
+    first.add_attempt("shared@example.com")
+    with pytest.raises(HTTPException) as exc_info:
+        second.check_rate_limit("shared@example.com")
+    assert exc_info.value.status_code == 429
+
+    second.reset_attempts("shared@example.com")
+    first.check_rate_limit("shared@example.com")
+
+
+def test_block_after_max_attempts():
+    limiter = RateLimiter(MemoryRateLimitStore())
+    limiter.progressive_delay = 0
+    for _ in range(limiter.max_attempts):
+        limiter.add_attempt("blocked@example.com")
+
+    with pytest.raises(HTTPException) as exc_info:
+        limiter.check_rate_limit("blocked@example.com")
+    assert "заблокирован" in exc_info.value.detail
+    assert limiter.store.get("blocked@example.com").blocked_until > 0
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, inspect, text
+
+from backend import models
+from backend.migrations import upgrade_schema
+from backend.search import build_match_query
+
+
+def search(client, headers, q):
+    response = client.get("/tasks/search", headers=headers, params={"q": q})
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_build_match_query():
+    assert build_match_query("deploy back*") == '"deploy" "back"*'
+    assert build_match_query('title:x OR "y') == '"title" "x" "OR" "y"'
+    with pytest.raises(ValueError):
+        build_match_query(" *** ")
+
+
+def test_search_ranks_title_matches_first(client, auth_headers):
+    client.post("/tasks/", headers=auth_headers, json={"title": "Write notes", "description": "About the release"})
+    client.post("/tasks/", headers=auth_headers, json={"title": "Release backend", "description": "Deploy it"})
+    client.post("/tasks/", headers=auth_headers, json={"title": "Unrelated", "description": "Nothing here"})
+
+    hits = search(client, auth_headers, "release")
+    assert [hit["task"]["title"] for hit in hits] == ["Release backend", "Write notes"]
+    assert "<mark>Release</mark>" in hits[0]["snippet"]
+
+    assert [hit["task"]["title"] for hit in search(client, auth_headers, "back*")] == ["Release backend"]
+    assert search(client, auth_headers, "release nothing") == []
+
+
+def test_search_snippet_escapes_task_text(client, auth_headers):
+    client.post("/tasks/", headers=auth_headers, json={
+        "title": "Payload", "description": "exploit <img src=x onerror=alert(1)> & more"
+    })
+
+    [hit] = search(client, auth_headers, "exploit")
+    assert hit["snippet"] == "<mark>exploit</mark> &lt;img src=x onerror=alert(1)&gt; &amp; more"
+
+
+def test_search_is_scoped_and_follows_changes(client, auth_headers, user_headers):
+    task_id = client.post("/tasks/", headers=auth_headers, json={"title": "Quarterly report"}).json()["id"]
+    client.post("/tasks/", headers=user_headers, json={"title": "Quarterly planning"})
+
+    assert [hit["task"]["id"] for hit in search(client, auth_headers, "quarterly")] == [task_id]
+
+    client.put(f"/tasks/{task_id}", headers=auth_headers, json={"title": "Annual report"})
+    assert search(client, auth_headers, "quarterly") == []
+    assert len(search(client, auth_headers, "annual")) == 1
+
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    assert search(client, auth_headers, "annual") == []
+
+
+def test_search_rejects_empty_query(client, auth_headers):
+    response = client.get("/tasks/search", headers=auth_headers, params={"q": "!!"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_upgrade_schema_builds_search_index_for_existing_data(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for name in ("tasks_fts_ai", "tasks_fts_ad", "tasks_fts_au"):
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        conn.execute(text("DROP TABLE tasks_fts"))
+        conn.execute(text("CREATE INDEX ix_tasks_title ON tasks (title)"))
+        conn.execute(text(
+            "INSERT INTO users (id, email, password_hash, secret_word, created_at, role, is_active, group_id) "
+            "VALUES (1, 'old@example.com', 'x', 'x', '2024-01-01', 'default', 1, 0)"
+        ))
+        conn.execute(text(
+            "INSERT INTO tasks (title, description, status, created_at, priority, user_id, created_by_id) "
+            "VALUES ('Legacy task', 'Imported', 0, '2024-01-01', 3, 1, 1)"
+        ))
+
+    upgrade_schema(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'legacy'")).all() == [(1,)]
+    assert "ix_tasks_title" not in {index["name"] for index in inspect(engine).get_indexes("tasks")}
+    engine.dispose()
@@ -0,0 +1,35 @@
+import json
+from datetime import datetime
+
+from backend import crud, models, schemas
+from backend.serializers import ORJSONResponse, task_to_dict, user_to_dict
+
+
+def test_task_serializer_matches_the_response_model():
+    now = datetime(2024, 5, 1, 12, 30, 15, 250)
+    task = models.Task(
+        id=1, title="Task", description=None, status=1, created_at=now, updated_at=None,
+        due_date=datetime(2024, 6, 1), priority=2, user_id=3, created_by_id=4
+    )
+    task.files = [models.TaskFile(
+        id=5, filename="spec.pdf", content_type="application/pdf", size=10, created_at=now, task_id=1
+    )]
+
+    fast = ORJSONResponse(task_to_dict(task)).body
+    assert fast == schemas.TaskResponse.model_validate(task).model_dump_json().encode()
+
+
+def test_user_serializer_matches_the_response_model(client, auth_headers, db_session):
+    user = crud.get_user_by_email(db_session, "test@example.com")
+    expected = schemas.UserResponse.model_validate(user).model_dump_json()
+    assert json.loads(ORJSONResponse(user_to_dict(user)).body) == json.loads(expected)
+
+
+def test_task_list_keeps_dependency_headers(client, auth_headers):
+    for title in ("A", "B"):
+        client.post("/tasks/", headers=auth_headers, json={"title": title})
+
+    response = client.get("/tasks/", headers=auth_headers, params={"limit": 1})
+    assert response.headers["content-type"] == "application/json"
+    assert "ETag" in response.headers and "X-Next-Cursor" in response.headers
+    assert [task["title"] for task in response.json()] == ["B"]
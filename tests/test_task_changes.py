@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+from fastapi import status
+from sqlalchemy import create_engine, text
+
+from backend import crud, models
+from backend.migrations import prune_tombstones, upgrade_schema
+
+
+def changes(client, headers, since, **params):
+    response = client.get("/tasks/changes", headers=headers, params={"since": since, **params})
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_changes_follow_writes(client, auth_headers):
+    first = client.post("/tasks/", headers=auth_headers, json={"title": "First"}).json()
+    second = client.post("/tasks/", headers=auth_headers, json={"title": "Second"}).json()
+    full = changes(client, auth_headers, 0)
+    assert [task["title"] for task in full["tasks"]] == ["First", "Second"]
+    assert full["tasks"][0]["updated_at"] is not None
+    assert (full["deleted_tasks"], full["deleted_files"], full["has_more"]) == ([], [], False)
+
+    assert changes(client, auth_headers, full["cursor"])["tasks"] == []
+
+    client.put(f"/tasks/{first['id']}", headers=auth_headers, json={"status": 1})
+    file_id = client.post(
+        f"/tasks/{first['id']}/files/", headers=auth_headers, files={"file": ("a.pdf", b"%PDF-1.4", "application/pdf")}
+    ).json()["id"]
+    client.delete(f"/tasks/{first['id']}/files/{file_id}", headers=auth_headers)
+    client.delete(f"/tasks/{second['id']}", headers=auth_headers)
+
+    delta = changes(client, auth_headers, full["cursor"])
+    assert [(task["id"], task["status"], task["files"]) for task in delta["tasks"]] == [(first["id"], 1, [])]
+    assert (delta["deleted_tasks"], delta["deleted_files"]) == ([second["id"]], [file_id])
+    assert delta["cursor"] > full["cursor"]
+
+
+def test_changes_are_paged_in_sequence_order(client, auth_headers):
+    for title in ("A", "B", "C"):
+        client.post("/tasks/", headers=auth_headers, json={"title": title})
+
+    page = changes(client, auth_headers, 0, limit=2)
+    assert [task["title"] for task in page["tasks"]] == ["A", "B"]
+    assert page["has_more"]
+    page = changes(client, auth_headers, page["cursor"], limit=2)
+    assert [task["title"] for task in page["tasks"]] == ["C"]
+    assert not page["has_more"]
+
+
+def test_reassigned_task_leaves_the_previous_assignee(client, auth_headers, user_headers, db_session):
+    pm_id = crud.get_user_by_email(db_session, "test@example.com").id
+    crud.update_user_role(db_session, pm_id, "pm")
+    user_id = crud.get_user_by_email(db_session, "user@example.com").id
+    task_id = client.post("/tasks/", headers=auth_headers, json={"title": "A", "user_id": user_id}).json()["id"]
+    user_cursor = changes(client, user_headers, 0)["cursor"]
+    pm_cursor = changes(client, auth_headers, 0)["cursor"]
+
+    client.put(f"/tasks/{task_id}/reassign", headers=auth_headers, params={"new_user_id": pm_id})
+
+    user_delta = changes(client, user_headers, user_cursor)
+    assert (user_delta["tasks"], user_delta["deleted_tasks"]) == ([], [task_id])
+    pm_delta = changes(client, auth_headers, pm_cursor)
+    assert ([task["user_id"] for task in pm_delta["tasks"]], pm_delta["deleted_tasks"]) == ([pm_id], [])
+
+
+def test_pruned_cursor_is_gone(client, auth_headers, db_session):
+    task_id = client.post("/tasks/", headers=auth_headers, json={"title": "A"}).json()["id"]
+    cursor = changes(client, auth_headers, 0)["cursor"]
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+
+    with db_session.get_bind().begin() as conn:
+        assert prune_tombstones(conn, datetime.now() + timedelta(minutes=1)) == 1
+
+    response = client.get("/tasks/changes", headers=auth_headers, params={"since": cursor})
+    assert response.status_code == status.HTTP_410_GONE
+    assert changes(client, auth_headers, 0)["tasks"] == []
+
+
+def test_upgrade_schema_numbers_existing_tasks(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for trigger in ("tasks_change_ai", "tasks_change_au", "tasks_change_ad", "task_files_change_ai",
+                        "task_files_change_au", "task_files_change_ad"):
+            conn.execute(text(f"DROP TRIGGER {trigger}"))
+        for index in ("ix_tasks_user_id_change_seq", "ix_tasks_created_by_id_change_seq"):
+            conn.execute(text(f"DROP INDEX {index}"))
+        conn.execute(text("ALTER TABLE tasks DROP COLUMN change_seq"))
+        conn.execute(text("ALTER TABLE tasks DROP COLUMN updated_at"))
+        conn.execute(text(
+            "INSERT INTO tasks (title, status, created_at, priority, user_id, created_by_id) "
+            "VALUES ('Legacy', 0, '2024-01-01', 3, 1, 1), ('Legacy too', 0, '2024-01-01', 3, 1, 1)"
+        ))
+    # As on startup: create_all() runs before upgrade_schema()
+    models.Base.metadata.create_all(bind=engine)
+
+    upgrade_schema(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO tasks (title, status, created_at, priority, user_id, created_by_id) "
+            "VALUES ('New', 0, '2024-01-02', 3, 1, 1)"
+        ))
+        rows = conn.execute(text("SELECT title, change_seq, updated_at IS NOT NULL FROM tasks ORDER BY id")).all()
+    assert rows == [("Legacy", 1, 1), ("Legacy too", 2, 1), ("New", 3, 0)]
+    engine.dispose()
@@ -0,0 +1,59 @@
+import re
+
+from fastapi import status
+
+from backend import schemas
+
+
+def create_task_with_file(client, headers):
+    task_id = client.post("/tasks/", headers=headers, json={"title": "Task", "description": "Long text"}).json()["id"]
+    client.post(f"/tasks/{task_id}/files/", headers=headers, files={"file": ("a.pdf", b"%PDF-1.4", "application/pdf")})
+    return task_id
+
+
+def test_summary_view_reads_only_card_columns(client, auth_headers, capture_sql):
+    task_id = create_task_with_file(client, auth_headers)
+
+    with capture_sql() as statements:
+        response = client.get("/tasks/", headers=auth_headers, params={"view": "summary"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": task_id, "title": "Task", "status": 0, "priority": 3, "due_date": None}]
+    assert set(response.json()[0]) == set(schemas.TaskSummary.model_fields)
+    task_reads = [statement for statement in statements if re.search(r"\bFROM tasks\b", statement)]
+    assert task_reads and not any("description" in statement for statement in task_reads)
+    assert not any(re.search(r"\btask_files\b", statement) for statement in statements)
+
+
+def test_fields_select_the_returned_fields(client, auth_headers):
+    task_id = create_task_with_file(client, auth_headers)
+
+    response = client.get("/assigned-tasks/", headers=auth_headers, params={"fields": "title, due_date"})
+    assert [list(task) for task in response.json()] == [["title", "due_date", "id"]]
+    [task] = client.get("/tasks/", headers=auth_headers, params={"fields": "title,files"}).json()
+    assert list(task) == ["title", "id", "files"]
+    assert (task["id"], [file["filename"] for file in task["files"]]) == (task_id, ["a.pdf"])
+
+    response = client.get("/tasks/", headers=auth_headers, params={"fields": "title,secret"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_profile_tasks_can_be_summarised(client, auth_headers):
+    create_task_with_file(client, auth_headers)
+
+    profile = client.get("/users/me/", headers=auth_headers, params={"view": "summary"}).json()
+    assert profile["email"] == "test@example.com"
+    assert [set(task) for task in profile["tasks"]] == [set(schemas.TaskSummary.model_fields)]
+
+    full = client.get("/users/me/", headers=auth_headers).json()
+    assert full["tasks"][0]["description"] == "Long text"
+    assert len(full["tasks"][0]["files"]) == 1
+
+
+def test_openapi_describes_projected_tasks(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    for path in ("/tasks/", "/assigned-tasks/"):
+        items = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["items"]
+        models = {ref["$ref"].rsplit("/", 1)[-1] for ref in items["anyOf"]}
+        assert models == {"TaskResponse", "TaskSummary", "TaskPartial"}
+    profile = paths["/users/me/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert profile["$ref"].endswith("/UserWithTaskProjections")
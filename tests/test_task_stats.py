@@ -0,0 +1,105 @@
+import re
+from datetime import datetime, timedelta
+
+from fastapi import status
+from sqlalchemy import create_engine, select, text
+
+from backend import crud, models
+from backend.migrations import rebuild_task_stats, upgrade_schema
+
+
+def stats(client, headers):
+    response = client.get("/tasks/stats", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def stat_rows(db_session):
+    db_session.expire_all()
+    return sorted(db_session.execute(select(models.TaskStat.__table__)).all())
+
+
+def test_task_stats_follow_task_changes(client, auth_headers, user_headers, db_session):
+    pm_id = crud.get_user_by_email(db_session, "test@example.com").id
+    crud.update_user_role(db_session, pm_id, "pm")
+    user_id = crud.get_user_by_email(db_session, "user@example.com").id
+
+    due = (datetime.now() + timedelta(days=3)).isoformat()
+    first = client.post("/tasks/", headers=auth_headers, json={"title": "A", "priority": 1, "user_id": user_id})
+    second = client.post("/tasks/", headers=auth_headers, json={"title": "B", "priority": 2, "due_date": due})
+    third = client.post("/tasks/", headers=auth_headers, json={"title": "C", "user_id": user_id})
+    client.put(f"/tasks/{first.json()['id']}", headers=user_headers, json={"status": 2})
+    client.put(f"/tasks/{third.json()['id']}/reassign", headers=auth_headers, params={"new_user_id": pm_id})
+    client.delete(f"/tasks/{second.json()['id']}", headers=auth_headers)
+
+    user_stats = stats(client, user_headers)
+    assert user_stats["created"] is None
+    assert user_stats["assigned"] == {
+        "total": 1, "by_status": {"0": 0, "1": 0, "2": 1}, "by_priority": {"1": 1, "2": 0, "3": 0, "4": 0},
+        "overdue": 0, "due_today": 0
+    }
+    pm_stats = stats(client, auth_headers)
+    assert (pm_stats["assigned"]["total"], pm_stats["created"]["total"]) == (1, 2)
+    assert pm_stats["created"]["by_status"] == {"0": 1, "1": 0, "2": 1}
+
+    incremental = stat_rows(db_session)
+    with db_session.get_bind().begin() as conn:
+        rebuild_task_stats(conn)
+    assert stat_rows(db_session) == incremental
+
+
+def test_task_stats_count_overdue_and_due_today(client, auth_headers, db_session):
+    user_id = crud.get_user_by_email(db_session, "test@example.com").id
+    now = datetime.now()
+    for due_date, task_status in [
+        (now - timedelta(days=2), 0),
+        (now - timedelta(days=2), 2),
+        (now.replace(hour=23, minute=59), 1),
+        (now + timedelta(days=2), 0),
+        (None, 0),
+    ]:
+        db_session.add(models.Task(
+            title="Task", status=task_status, due_date=due_date, user_id=user_id, created_by_id=user_id
+        ))
+    db_session.commit()
+
+    counts = stats(client, auth_headers)["assigned"]
+    assert (counts["total"], counts["overdue"], counts["due_today"]) == (5, 1, 1)
+
+
+def test_task_stats_overdue_matches_the_overdue_filter(client, auth_headers, db_session):
+    user_id = crud.get_user_by_email(db_session, "test@example.com").id
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    for due_date in (today - timedelta(seconds=1), today):
+        db_session.add(models.Task(title="Task", due_date=due_date, user_id=user_id, created_by_id=user_id))
+    db_session.commit()
+
+    counts = stats(client, auth_headers)["assigned"]
+    overdue = client.get("/tasks/", headers=auth_headers, params={"overdue": True}).json()
+    assert (counts["overdue"], counts["due_today"]) == (len(overdue), 1) == (1, 1)
+
+
+def test_task_stats_do_not_read_tasks(client, auth_headers, capture_sql):
+    client.post("/tasks/", headers=auth_headers, json={"title": "Task"})
+    with capture_sql() as statements:
+        stats(client, auth_headers)
+    assert not any(re.search(r"\bFROM tasks\b", statement) for statement in statements)
+
+
+def test_upgrade_schema_builds_task_stats_for_existing_data(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for name in ("task_stats_ai", "task_stats_ad", "task_stats_au"):
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        conn.execute(text(
+            "INSERT INTO tasks (title, status, created_at, priority, user_id, created_by_id) "
+            "VALUES ('Legacy', 0, '2024-01-01', 3, 1, 2), ('Legacy done', 2, '2024-01-01', 3, 1, 2)"
+        ))
+
+    upgrade_schema(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT scope, owner_id, status, count FROM task_stats ORDER BY 1, 3")).all()
+    assert rows == [("assignee", 1, 0, 1), ("assignee", 1, 2, 1), ("creator", 2, 0, 1), ("creator", 2, 2, 1)]
+    engine.dispose()
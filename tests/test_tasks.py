@@ -1,5 +1,10 @@
+from datetime import datetime
+
+import pytest
 from fastapi import status
 
+from backend import crud, schemas
+
 
 def test_create_task(client, auth_headers):
     response = client.post(
@@ -147,3 +152,227 @@ def test_task_priority_update(client, auth_headers):
     )
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["priority"] == 1
+
+
+def test_tasks_cursor_pagination(client, auth_headers):
+    created_ids = [
+        client.post("/tasks/", headers=auth_headers, json={"title": f"Task {i}"}).json()["id"]
+        for i in range(5)
+    ]
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/tasks/", headers=auth_headers, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(task["id"] for task in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    assert seen == list(reversed(created_ids))
+
+
+def test_tasks_invalid_cursor(client, auth_headers):
+    response = client.get("/tasks/", headers=auth_headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_read_users_me_constant_queries(client, auth_headers, db_session, capture_sql):
+    def add_tasks(count):
+        for i in range(count):
+            task_id = client.post("/tasks/", headers=auth_headers, json={"title": f"Task {i}"}).json()["id"]
+            client.post(
+                f"/tasks/{task_id}/files/", headers=auth_headers, files={"file": (f"{i}.png", b"img", "image/png")}
+            )
+
+    def read_me():
+        db_session.expire_all()
+        with capture_sql() as statements:
+            response = client.get("/users/me/", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        return response.json(), len(statements)
+
+    add_tasks(2)
+    data, few_tasks_queries = read_me()
+    assert len(data["tasks"]) == 2
+    assert len(data["tasks"][0]["files"]) == 1
+
+    add_tasks(5)
+    data, many_tasks_queries = read_me()
+    assert len(data["created_tasks"]) == 7
+    assert many_tasks_queries == few_tasks_queries <= 6
+
+
+def test_read_users_me_summary(client, auth_headers):
+    client.post("/tasks/", headers=auth_headers, json={"title": "Summary Task"})
+
+    response = client.get("/users/me/summary", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["email"] == "test@example.com"
+    assert data["tasks_count"] == 1
+    assert data["created_tasks_count"] == 1
+    assert "tasks" not in data
+
+
+def test_bulk_create_tasks(client, auth_headers, capture_sql):
+    tasks = [{"title": f"Sprint task {i}", "priority": i % 4 + 1} for i in range(50)]
+    with capture_sql() as statements:
+        response = client.post("/tasks/bulk", headers=auth_headers, json={"tasks": tasks})
+    assert response.status_code == status.HTTP_200_OK
+    ids = response.json()["ids"]
+    assert len(ids) == 50
+    assert sum(statement.lstrip().upper().startswith("INSERT") for statement in statements) == 1
+
+    task = client.get(f"/tasks/{ids[7]}", headers=auth_headers).json()
+    assert task["title"] == "Sprint task 7"
+    assert task["priority"] == 4
+
+
+def test_bulk_create_tasks_atomic_rejects_invalid_items(client, auth_headers):
+    tasks = [{"title": "Valid"}, {"title": ""}, {"title": "Valid too", "priority": 9}]
+    response = client.post("/tasks/bulk", headers=auth_headers, json={"tasks": tasks})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert [error["index"] for error in response.json()["detail"]] == [1, 2]
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+
+
+def test_bulk_create_tasks_reports_errors_per_item(client, auth_headers, db_session):
+    user = crud.get_user_by_email(db_session, "test@example.com")
+    crud.update_user_role(db_session, user.id, "pm")
+    tasks = [{"title": "Mine"}, {"title": "Nobody's", "user_id": 99999}, {"title": "Bad", "status": 7}]
+    response = client.post("/tasks/bulk", headers=auth_headers, json={"tasks": tasks, "atomic": False})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data["ids"]) == 1
+    assert [error["index"] for error in data["errors"]] == [1, 2]
+    assert "99999" in data["errors"][0]["detail"]
+
+
+def test_bulk_update_tasks(client, auth_headers, user_headers, capture_sql):
+    ids = client.post(
+        "/tasks/bulk", headers=auth_headers, json={"tasks": [{"title": f"Card {i}"} for i in range(20)]}
+    ).json()["ids"]
+    foreign_id = client.post("/tasks/", headers=user_headers, json={"title": "Not mine"}).json()["id"]
+
+    with capture_sql() as statements:
+        response = client.patch(
+            "/tasks/bulk",
+            headers=auth_headers,
+            json={"ids": ids + [foreign_id], "changes": {"status": 2, "priority": 1}}
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"updated": sorted(ids), "not_found": [foreign_id]}
+    assert sum(statement.lstrip().upper().startswith("UPDATE") for statement in statements) == 1
+
+    task = client.get(f"/tasks/{ids[0]}", headers=auth_headers).json()
+    assert (task["status"], task["priority"]) == (2, 1)
+    assert client.get(f"/tasks/{foreign_id}", headers=user_headers).json()["status"] == 0
+
+
+def test_bulk_update_tasks_requires_changes(client, auth_headers):
+    response = client.patch("/tasks/bulk", headers=auth_headers, json={"ids": [1], "changes": {}})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_bulk_update_tasks_rejects_null_title(client, auth_headers):
+    task_id = client.post("/tasks/", headers=auth_headers, json={"title": "Kept"}).json()["id"]
+
+    response = client.patch("/tasks/bulk", headers=auth_headers, json={"ids": [task_id], "changes": {"title": None}})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["title"] == "Kept"
+
+
+def test_bulk_reassign_tasks(client, auth_headers, user_headers, db_session, capture_sql):
+    pm_id = crud.get_user_by_email(db_session, "test@example.com").id
+    crud.update_user_role(db_session, pm_id, "pm")
+    leaving_id = crud.get_user_by_email(db_session, "user@example.com").id
+    tasks = [{"title": f"Task {i}", "user_id": leaving_id} for i in range(30)]
+    ids = client.post("/tasks/bulk", headers=auth_headers, json={"tasks": tasks}).json()["ids"]
+    client.patch("/tasks/bulk", headers=auth_headers, json={"ids": ids[:5], "changes": {"status": 2}})
+    own_id = client.post("/tasks/", headers=user_headers, json={"title": "Own task"}).json()["id"]
+
+    with capture_sql() as statements:
+        response = client.post(
+            "/assigned-tasks/reassign",
+            headers=auth_headers,
+            json={"from_user_id": leaving_id, "to_user_id": pm_id, "status": 0}
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"count": 25, "ids": ids[5:]}
+    assert sum(statement.lstrip().upper().startswith("UPDATE") for statement in statements) == 1
+
+    remaining = {task["id"] for task in client.get("/tasks/?limit=100", headers=user_headers).json()}
+    assert remaining == set(ids[:5]) | {own_id}
+
+
+def test_bulk_reassign_requires_pm(client, auth_headers):
+    response = client.post("/assigned-tasks/reassign", headers=auth_headers, json={"from_user_id": 1, "to_user_id": 2})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_bulk_reassign_rejects_unknown_status(client, auth_headers):
+    response = client.post(
+        "/assigned-tasks/reassign", headers=auth_headers, json={"from_user_id": 1, "to_user_id": 2, "status": 5}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_tasks_filters_and_sort(client, auth_headers):
+    tasks = [
+        {"title": "Urgent", "priority": 1, "due_date": "2099-01-10T12:00:00"},
+        {"title": "Later", "priority": 3, "due_date": "2099-03-01T12:00:00"},
+        {"title": "Someday", "priority": 4},
+        {"title": "Done", "priority": 2, "due_date": "2099-02-01T12:00:00"},
+    ]
+    ids = client.post("/tasks/bulk", headers=auth_headers, json={"tasks": tasks}).json()["ids"]
+    client.patch("/tasks/bulk", headers=auth_headers, json={"ids": [ids[3]], "changes": {"status": 2}})
+
+    def titles(**params):
+        response = client.get("/tasks/", headers=auth_headers, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        return [task["title"] for task in response.json()]
+
+    assert titles(sort="due_date") == ["Urgent", "Done", "Later", "Someday"]
+    assert titles(sort="-priority") == ["Someday", "Later", "Done", "Urgent"]
+    assert titles(status=[0, 1], sort="due_date") == ["Urgent", "Later", "Someday"]
+    assert titles(priority_min=2, priority_max=3, sort="priority") == ["Done", "Later"]
+    assert titles(due_after="2099-01-15T00:00:00", due_before="2099-02-15T00:00:00") == ["Done"]
+    assert titles(overdue=True) == []
+    assert titles(sort="priority", skip=1, limit=2) == ["Done", "Later"]
+
+
+def test_tasks_cursor_requires_default_sort(client, auth_headers):
+    for i in range(3):
+        client.post("/tasks/", headers=auth_headers, json={"title": f"Task {i}"})
+    response = client.get("/tasks/", headers=auth_headers, params={"limit": 1, "sort": "due_date"})
+    assert "X-Next-Cursor" not in response.headers
+
+    cursor = client.get("/tasks/", headers=auth_headers, params={"limit": 1}).headers["X-Next-Cursor"]
+    response = client.get("/tasks/", headers=auth_headers, params={"cursor": cursor, "sort": "priority"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize("filter_field", ["user_id", "created_by_id"])
+@pytest.mark.parametrize("filters", [
+    {},
+    {"status": [0, 1]},
+    {"status": [2], "sort": "due_date"},
+    {"overdue": True},
+    {"due_after": datetime(2099, 1, 1), "due_before": datetime(2099, 2, 1)},
+    {"status": [1], "due_before": datetime(2099, 2, 1), "sort": "-due_date"},
+    {"priority_min": 1, "priority_max": 2, "sort": "priority"},
+])
+def test_task_filters_use_indexes(db_session, filter_field, filters):
+    query = crud._filtered_tasks_query(filter_field, 1, filters=schemas.TaskFilters(**filters))
+    compiled = query.compile(dialect=db_session.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(
+        str(value) if isinstance(value, datetime) else value
+        for value in (compiled.params[name] for name in compiled.positiontup)
+    )
+    plan = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    details = [row[-1] for row in plan]
+    assert not any(detail.startswith("SCAN tasks") for detail in details), details
+    assert any(detail.startswith("SEARCH tasks USING INDEX") for detail in details), details